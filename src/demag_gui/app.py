@@ -7,6 +7,8 @@ from demag_gui.gui.hs_control import HSControlPanel
 from demag_gui.gui.mips_control import MIPSControlPanel
 from demag_gui.gui.mct_control import MCTControlPanel
 from demag_gui.gui.nmr_control import NMRControlPanel
+from demag_gui.gui.demag_monitor import DemagMonitorPanel
+from demag_gui.core.scheduler import get_scheduler
 import threading
 
 
@@ -62,6 +64,7 @@ class InstrumentApp(QWidget):
         self.nmr_panel = None
         self.mips_panel = None
         self.hs_panel = None
+        self.demag_panel = None
         self.worker_thread = None
         self.worker = None
         self.setup_ui()
@@ -87,10 +90,12 @@ class InstrumentApp(QWidget):
         self.nmr_panel = NMRControlPanel()
         self.mips_panel = MIPSControlPanel()
         self.hs_panel = HSControlPanel()
+        self.demag_panel = DemagMonitorPanel(self.mct_panel.mct_calc)
 
         right_layout.addWidget(self.nmr_panel, 0)
         right_layout.addWidget(self.mips_panel, 0)
         right_layout.addWidget(self.hs_panel, 0)
+        right_layout.addWidget(self.demag_panel, 0)
 
         instruments_layout.addLayout(right_layout, 1)
         main_layout.addLayout(instruments_layout)
@@ -268,6 +273,7 @@ class InstrumentApp(QWidget):
         for panel in [self.mct_panel, self.nmr_panel, self.mips_panel, self.hs_panel]:
             if hasattr(panel, 'close'):
                 panel.close()
+        get_scheduler().stop()
 
         event.accept()
 
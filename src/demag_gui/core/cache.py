@@ -0,0 +1,45 @@
+# cache.py
+import math
+import threading
+
+
+class LatestValueCache:
+    """
+    Thread-safe store of the latest reading of every parameter.
+
+    Filled by the acquisition scheduler from its bus workers with the full
+    precision values and their acquisition timestamps, so measurements and
+    panels never have to read values back from Qt widgets.
+    """
+
+    def __init__(self):
+        self._values = {}  # name -> (value, timestamp)
+        self._lock = threading.Lock()
+
+    def update(self, name, value, timestamp):
+        with self._lock:
+            self._values[name] = (value, timestamp)
+
+    def get(self, name):
+        """Return (value, timestamp), or (None, None) if never read"""
+        with self._lock:
+            return self._values.get(name, (None, None))
+
+    def value(self, name, default=math.nan):
+        value, _ = self.get(name)
+        return default if value is None else value
+
+    def timestamp(self, name):
+        return self.get(name)[1]
+
+    def snapshot(self, names=None):
+        """Consistent copy of several entries, {name: (value, timestamp)}"""
+        with self._lock:
+            if names is None:
+                return dict(self._values)
+            return {name: self._values.get(name, (None, None)) for name in names}
+
+    def remove(self, names):
+        with self._lock:
+            for name in names:
+                self._values.pop(name, None)
@@ -0,0 +1,65 @@
+# datasaver.py
+from time import perf_counter
+
+
+class BufferedDataSaver:
+    """
+    Wrapper around a QCoDeS DataSaver that writes rows to the database in bulk.
+
+    Rows are kept in memory by the DataSaver and flushed when
+    ``flush_size`` rows are pending or ``flush_interval`` seconds have
+    passed, whichever comes first. Call ``flush`` before leaving the
+    ``Measurement.run()`` context (the DataSaver also flushes on exit,
+    including on exceptions). Flush latencies are recorded in ``stats``.
+    """
+
+    def __init__(self, datasaver, flush_interval=10., flush_size=100):
+        self.datasaver = datasaver
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # flushing is decided here, not by the DataSaver write period
+        self.datasaver.write_period = float('inf')
+
+        self.pending = 0
+        self.rows_written = 0
+        self.n_flushes = 0
+        self.last_latency = 0.  # in s
+        self.max_latency = 0.
+        self.total_latency = 0.
+        self._last_flush = perf_counter()
+
+    def add_result(self, *results):
+        self.datasaver.add_result(*results)
+        self.pending += 1
+        if (self.pending >= self.flush_size
+                or perf_counter() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write all pending rows now"""
+        self._last_flush = perf_counter()
+        if not self.pending:
+            return
+        self.datasaver.flush_data_to_database()
+        latency = perf_counter() - self._last_flush
+        self.rows_written += self.pending
+        self.pending = 0
+        self.n_flushes += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+    def stats(self):
+        return {
+            'rows_written': self.rows_written,
+            'pending': self.pending,
+            'flushes': self.n_flushes,
+            'last_latency': self.last_latency,
+            'max_latency': self.max_latency,
+            'mean_latency': self.total_latency / self.n_flushes if self.n_flushes else 0.,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"{s['rows_written']} rows in {s['flushes']} flushes, "
+                f"mean {1e3*s['mean_latency']:.1f} ms, max {1e3*s['max_latency']:.1f} ms")
@@ -0,0 +1,129 @@
+# history.py
+import numpy as np
+
+from demag_gui.core.ringbuffer import TimeSeriesBuffer
+
+
+class MultiResolutionHistory:
+    """
+    Time series history with min/max decimated tiers for long runs.
+
+    Recent samples are kept raw. Every ``factor`` samples are also reduced
+    to one bucket holding the minimum and maximum of each channel, and
+    every ``factor`` buckets of a tier are reduced again into the next
+    tier. With the defaults the raw store holds 10^5 samples and the
+    coarsest tier 10^8, i.e. months at 10 Hz, in bounded memory.
+
+    ``query`` picks the finest level that covers the requested time range
+    within a point budget, so plotting cost does not grow with the run.
+    Buckets are drawn as their min and max, so a single sample spike is
+    still visible at every tier.
+    """
+
+    def __init__(self, capacity=10**5, channels=('value',), factor=10, levels=3):
+        self.channels = tuple(channels)
+        self.factor = factor
+        self.raw = TimeSeriesBuffer(capacity, self.channels)
+        tier_channels = [f'{c}_{s}' for c in self.channels for s in ('min', 'max')]
+        self.tiers = [TimeSeriesBuffer(capacity, tier_channels) for _ in range(levels)]
+        # partially filled bucket per tier: [t_start, count, mins, maxs, t_last]
+        self._acc = [None] * levels
+        # time of the newest sample in the last completed bucket per tier
+        self._t_end = [None] * levels
+        self._t_first = None
+
+    def __len__(self):
+        return len(self.raw)
+
+    def clear(self):
+        self.raw.clear()
+        for tier in self.tiers:
+            tier.clear()
+        self._acc = [None] * len(self.tiers)
+        self._t_end = [None] * len(self.tiers)
+        self._t_first = None
+
+    def append(self, timestamp, *values):
+        """Append one sample, values in the order of ``channels``"""
+        if self._t_first is None:
+            self._t_first = timestamp
+        self.raw.append(timestamp, *values)
+        values = np.asarray(values, dtype=float)
+        self._feed(0, timestamp, values, values, timestamp)
+
+    def _feed(self, level, timestamp, mins, maxs, t_last):
+        if level == len(self.tiers):
+            return
+        acc = self._acc[level]
+        if acc is None:
+            self._acc[level] = acc = [timestamp, 0, mins.copy(), maxs.copy(), t_last]
+        else:
+            np.minimum(acc[2], mins, out=acc[2])
+            np.maximum(acc[3], maxs, out=acc[3])
+            acc[4] = t_last
+        acc[1] += 1
+        if acc[1] == self.factor:
+            self._acc[level] = None
+            self._t_end[level] = t_last
+            self.tiers[level].append(acc[0], *np.column_stack((acc[2], acc[3])).ravel())
+            self._feed(level + 1, acc[0], acc[2], acc[3], t_last)
+
+    def _level_slice(self, level, channel, t0, t1):
+        """Data of one level within [t0, t1], including its undecimated tail"""
+        if level < 0:
+            times = self.raw.times()
+            i0 = np.searchsorted(times, t0, side='left')
+            i1 = np.searchsorted(times, t1, side='right')
+            return times[i0:i1], self.raw.values(channel)[i0:i1]
+
+        tier = self.tiers[level]
+        times = tier.times()
+        i0 = np.searchsorted(times, t0, side='left')
+        i1 = np.searchsorted(times, t1, side='right')
+        x = np.repeat(times[i0:i1], 2)
+        y = np.column_stack((tier.values(f'{channel}_min')[i0:i1],
+                             tier.values(f'{channel}_max')[i0:i1])).ravel()
+
+        # samples newer than the last completed bucket come from finer levels,
+        # also those in their partial buckets when this level has none open
+        t_end = self._t_end[level]
+        t_tail = -np.inf if t_end is None else np.nextafter(t_end, np.inf)
+        if t_tail <= t1:
+            x_tail, y_tail = self._level_slice(level - 1, channel, max(t0, t_tail), t1)
+            x = np.concatenate((x, x_tail))
+            y = np.concatenate((y, y_tail))
+        return x, y
+
+    def _count(self, level, t0, t1):
+        """Number of plotted points of a level within [t0, t1], tail excluded"""
+        times = self.raw.times() if level < 0 else self.tiers[level].times()
+        n = np.searchsorted(times, t1, side='right') - np.searchsorted(times, t0, side='left')
+        return n if level < 0 else 2 * n
+
+    def _oldest(self, level):
+        buffer = self.raw if level < 0 else self.tiers[level]
+        return buffer.times()[0]
+
+    def query(self, channel, t0=None, t1=None, max_points=4000):
+        """
+        Return (times, values) of ``channel`` between ``t0`` and ``t1``.
+
+        The finest level that reaches back to ``t0`` and needs no more than
+        ``max_points`` points is used; if none does, the coarsest level is.
+        """
+        if not len(self.raw):
+            return np.empty(0), np.empty(0)
+        if t0 is None:
+            t0 = -np.inf
+        if t1 is None:
+            t1 = np.inf
+
+        # a level covers the range if it still holds data from before t0
+        start = max(t0, self._t_first)
+        levels = [-1] + [i for i in range(len(self.tiers)) if len(self.tiers[i])]
+        chosen = levels[-1]
+        for level in levels:
+            if self._oldest(level) <= start and self._count(level, t0, t1) <= max_points:
+                chosen = level
+                break
+        return self._level_slice(chosen, channel, t0, t1)
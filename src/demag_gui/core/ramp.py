@@ -0,0 +1,165 @@
+# ramp.py
+import contextlib
+import threading
+from concurrent.futures import Future
+
+
+class RampHandle:
+    """
+    Handle of a ramp running in a background thread.
+
+    ``result()`` waits for the outcome like a future, ``cancel()`` asks the
+    ramp to stop at its next poll. Progress events are passed to the
+    callbacks added with ``add_progress_callback``; they are called from
+    the ramp thread, so GUI code should forward them through a signal.
+    """
+
+    def __init__(self, stop_callback=None):
+        self.future = Future()
+        self.progress = None  # latest progress event
+        self._stop_callback = stop_callback
+        self._stop = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self._stop.set()
+
+    def stopping(self):
+        """True once cancel() was called or the stop callback returned True"""
+        if not self._stop.is_set() and self._stop_callback and self._stop_callback():
+            self._stop.set()
+        return self._stop.is_set()
+
+    def wait(self, timeout):
+        """Sleep up to ``timeout`` s, returning early on cancel()"""
+        self._stop.wait(timeout)
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def add_done_callback(self, fn):
+        """Call ``fn(handle)`` when the ramp has ended"""
+        self.future.add_done_callback(lambda _: fn(self))
+
+    def add_progress_callback(self, fn):
+        """Call ``fn(*event)`` on every progress event"""
+        with self._lock:
+            self._callbacks.append(fn)
+            event = self.progress
+        if event is not None:
+            fn(*event)
+
+    def report(self, *event):
+        with self._lock:
+            self.progress = event
+            callbacks = list(self._callbacks)
+        for fn in callbacks:
+            fn(*event)
+
+
+def run_ramp(job, stop_callback=None, progress_callback=None, name='ramp'):
+    """
+    Run ``job(handle)`` in a daemon thread and return its RampHandle.
+
+    The return value of ``job`` becomes the result of the handle, an
+    exception raised by it is re-raised by ``handle.result()``.
+    """
+    handle = RampHandle(stop_callback)
+    if progress_callback:
+        handle.add_progress_callback(progress_callback)
+
+    def target():
+        try:
+            handle.future.set_result(job(handle))
+        except BaseException as e:
+            handle.future.set_exception(e)
+
+    handle.future.set_running_or_notify_cancel()
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return handle
+
+
+def start_magnet_ramp(worker, target=None, rate=None, lock=None, stop_callback=None,
+                      progress_callback=None, min_interval=0.1, max_interval=5.):
+    """
+    Ramp a MercuryiPS power supply without blocking the caller.
+
+    Sets ``target`` (T) and ``rate`` (T/s) if given, starts the ramp and
+    waits for it in the background with the adaptive polling of
+    ``worker.wait_for_ramp``. Progress events are (status, time left).
+    If stopped, the supply is put on HOLD. ``lock``, typically the bus lock
+    of the scheduler, is held only around single transactions.
+
+    Returns a RampHandle whose result is True if the target was reached
+    and False if the ramp was stopped.
+    """
+    lock = contextlib.nullcontext() if lock is None else lock
+
+    def job(handle):
+        with lock:
+            if rate is not None:
+                worker.field_ramp_rate(rate)
+            if target is not None:
+                worker.field_target(target)
+            worker.ramp_to_target()
+        finished = worker.wait_for_ramp(stop_callback=handle.stopping,
+                                        progress_callback=handle.report,
+                                        lock=lock, sleep=handle.wait,
+                                        min_interval=min_interval,
+                                        max_interval=max_interval)
+        if not finished:
+            with lock:
+                worker.ramp_status('HOLD')
+        return finished
+
+    return run_ramp(job, stop_callback, progress_callback, name=f'ramp {worker.name}')
+
+
+def start_stepped_ramp(scheduler, name, setter, values, interval, resource=None,
+                       stop_callback=None, progress_callback=None):
+    """
+    Step a setpoint through ``values`` as a task of the acquisition scheduler.
+
+    One value is set every ``interval`` s by the bus worker of
+    ``resource``, so the ramp shares the bus with the polled readings
+    instead of blocking it. Each step is published by the scheduler as
+    ``name`` with the value (setpoint, step, number of steps), and also
+    reported as a progress event.
+
+    Returns a RampHandle whose result is True when all values were set
+    and False if stopped; an exception raised by ``setter`` ends the ramp
+    and is re-raised by ``handle.result()``.
+    """
+    handle = RampHandle(stop_callback)
+    if progress_callback:
+        handle.add_progress_callback(progress_callback)
+    values = list(values)
+    steps = iter(enumerate(values, 1))
+
+    def step():
+        if handle.stopping():
+            scheduler.unregister(name)
+            handle.future.set_result(False)
+            return None
+        i, value = next(steps, (None, None))
+        if i is None:
+            scheduler.unregister(name)
+            handle.future.set_result(True)
+            return None
+        try:
+            setter(value)
+        except Exception as e:
+            scheduler.unregister(name)
+            handle.future.set_exception(e)
+            return None
+        event = (value, i, len(values))
+        handle.report(*event)
+        return event
+
+    handle.future.set_running_or_notify_cancel()
+    scheduler.register(name, step, interval, priority=1, resource=resource)
+    return handle
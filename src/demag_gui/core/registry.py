@@ -0,0 +1,80 @@
+# registry.py
+import importlib
+import importlib.util
+import inspect
+import os
+import threading
+
+
+def measurement(func=None, *, panels=False):
+    """
+    Mark a function as a measurement shown in the GUI.
+
+    With ``panels=True`` the function receives the four instrument panels
+    instead of the instruments. Usable as ``@measurement`` or
+    ``@measurement(panels=True)``.
+    """
+    def mark(f):
+        f.__measurement__ = {'panels': panels}
+        return f
+    if func is None:
+        return mark
+    return mark(func)
+
+
+class MeasurementRegistry:
+    """
+    Measurement functions discovered from one module.
+
+    The module is scanned once for functions marked with ``@measurement``.
+    It is only loaded again when its source file changes, and then as a
+    fresh module object, so functions already handed to a running worker
+    keep their own globals and are not affected by the reload.
+    """
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+        self.module = None
+        self._mtime = None
+        self._functions = {}
+        self._lock = threading.Lock()
+
+    def _source_mtime(self):
+        try:
+            return os.stat(self.module.__file__).st_mtime
+        except (AttributeError, OSError, TypeError):
+            return None
+
+    def _scan(self, module):
+        functions = {}
+        for name, obj in vars(module).items():
+            if inspect.isfunction(obj) and hasattr(obj, '__measurement__'):
+                functions[name] = obj
+        return functions
+
+    def refresh(self):
+        """Load the module the first time or when its source changed, return True if (re)loaded"""
+        with self._lock:
+            if self.module is None:
+                self.module = importlib.import_module(self.module_name)
+            elif self._source_mtime() == self._mtime:
+                return False
+            else:
+                spec = importlib.util.spec_from_file_location(self.module_name, self.module.__file__)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self.module = module
+            self._mtime = self._source_mtime()
+            self._functions = self._scan(self.module)
+            return True
+
+    def measurements(self):
+        """List of (name, doc) of all registered measurements"""
+        reloaded = self.refresh()
+        functions = [(name, func.__doc__ or "No description")
+                     for name, func in self._functions.items()]
+        return functions, reloaded
+
+    def get(self, name):
+        self.refresh()
+        return self._functions.get(name)
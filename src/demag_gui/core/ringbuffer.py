@@ -0,0 +1,77 @@
+# ringbuffer.py
+import numpy as np
+
+
+class TimeSeriesBuffer:
+    """
+    Preallocated time series store for live plots.
+
+    Samples are written into a buffer of twice the capacity. When the end
+    is reached the most recent ``capacity`` samples are moved back to the
+    front in one block copy, so appending is O(1) amortized and the last
+    ``capacity`` samples are always one contiguous slice. ``times()`` and
+    ``values()`` return views into the buffer without copying; they are
+    only valid until the next ``append``.
+    """
+
+    def __init__(self, capacity, channels=('value',), dtype=float):
+        self.capacity = int(capacity)
+        self.channels = {name: i for i, name in enumerate(channels)}
+        self._t = np.empty(2 * self.capacity, dtype=float)
+        self._data = np.empty((len(self.channels), 2 * self.capacity), dtype=dtype)
+        self._start = 0
+        self._stop = 0
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def clear(self):
+        self._start = 0
+        self._stop = 0
+
+    def _compact(self):
+        n = self.capacity - 1
+        self._t[:n] = self._t[self._stop - n:self._stop]
+        self._data[:, :n] = self._data[:, self._stop - n:self._stop]
+        self._start, self._stop = 0, n
+
+    def append(self, timestamp, *values):
+        """Append one sample, values in the order of ``channels``"""
+        if self._stop == self._t.size:
+            self._compact()
+        self._t[self._stop] = timestamp
+        self._data[:, self._stop] = values
+        self._stop += 1
+        if self._stop - self._start > self.capacity:
+            self._start += 1
+
+    def extend(self, timestamps, values):
+        """Append a block of samples, ``values`` has shape (channels, n)"""
+        timestamps = np.asarray(timestamps, dtype=float)
+        values = np.asarray(values).reshape(len(self.channels), -1)
+        n = timestamps.size
+        if n >= self.capacity:
+            self._t[:self.capacity] = timestamps[-self.capacity:]
+            self._data[:, :self.capacity] = values[:, -self.capacity:]
+            self._start, self._stop = 0, self.capacity
+            return
+        if self._stop + n > self._t.size:
+            self._compact()
+        self._t[self._stop:self._stop + n] = timestamps
+        self._data[:, self._stop:self._stop + n] = values
+        self._stop += n
+        self._start = max(self._start, self._stop - self.capacity)
+
+    def times(self):
+        return self._t[self._start:self._stop]
+
+    def values(self, channel):
+        return self._data[self.channels[channel], self._start:self._stop]
+
+    def last(self, channel=None):
+        """Most recent timestamp, or most recent value of ``channel``"""
+        if not len(self):
+            return None
+        if channel is None:
+            return self._t[self._stop - 1]
+        return self._data[self.channels[channel], self._stop - 1]
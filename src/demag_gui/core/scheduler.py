@@ -0,0 +1,277 @@
+# scheduler.py
+import heapq
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from demag_gui.core.cache import LatestValueCache
+
+
+def bus_of(resource):
+    """
+    Map a VISA resource string to the bus it is transferred on.
+
+    'GPIB0::28::INSTR' -> 'GPIB0', 'ASRL3::INSTR' -> 'ASRL3',
+    'TCPIP0::10.18.18.9::7020::SOCKET' -> 'TCPIP0::10.18.18.9'.
+    Tasks without a resource share the 'local' bus.
+    """
+    if not resource:
+        return 'local'
+    parts = resource.split('::')
+    if parts[0].upper().startswith('TCPIP') and len(parts) > 1:
+        return '::'.join(parts[:2])
+    return parts[0]
+
+
+class PollTask:
+    """A parameter polled by the scheduler at a target rate"""
+
+    def __init__(self, name, getter, interval, priority=0, resource=None, fields=None):
+        self.name = name
+        self.getter = getter
+        self.interval = interval  # in s
+        self.priority = priority  # higher runs first when several are due
+        self.resource = resource
+        # names of the elements of a tuple reading, cached as f'{name}_{field}'
+        self.fields = fields
+        self.bus = bus_of(resource)
+
+        self.next_due = time.monotonic()
+        self.active = True
+        self.n_reads = 0
+        self.n_missed = 0
+        self.last_latency = 0.  # in s
+
+    def cache_names(self):
+        if self.fields is None:
+            return [self.name]
+        return [f'{self.name}_{field}' for field in self.fields]
+
+    def stats(self):
+        return {
+            'bus': self.bus,
+            'interval': self.interval,
+            'reads': self.n_reads,
+            'missed': self.n_missed,
+            'latency': self.last_latency,
+        }
+
+
+class BusWorker(QThread):
+    """
+    Runs the tasks of one bus, one transaction at a time.
+
+    Tasks that are due together are executed back to back in priority
+    order while holding the bus lock, so nothing else talks to the bus
+    in between.
+    """
+
+    def __init__(self, scheduler, bus):
+        super().__init__()
+        self.scheduler = scheduler
+        self.bus = bus
+        self.lock = threading.RLock()  # held for every bus transaction
+        self._cond = threading.Condition()
+        self._heap = []  # (next_due, -priority, seq, task)
+        self._seq = 0
+        self._is_running = True
+
+    def add(self, task):
+        with self._cond:
+            self._push(task)
+            self._cond.notify()
+
+    def _push(self, task):
+        self._seq += 1
+        heapq.heappush(self._heap, (task.next_due, -task.priority, self._seq, task))
+
+    def _pop_due(self):
+        """Wait for the next due tasks and return them in priority order"""
+        with self._cond:
+            while self._is_running:
+                while self._heap and not self._heap[0][3].active:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                now = time.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    if entry[3].active:
+                        due.append(entry)
+                due.sort(key=lambda e: (e[1], e[0]))
+                return [e[3] for e in due]
+            return []
+
+    def run(self):
+        while self._is_running:
+            due = self._pop_due()
+            with self.lock:
+                for task in due:
+                    if task.active:
+                        self._execute(task)
+            with self._cond:
+                for task in due:
+                    if task.active:
+                        self._push(task)
+
+    def _execute(self, task):
+        start = time.monotonic()
+        late = start - task.next_due
+        if late > task.interval:
+            n = int(late // task.interval)
+            task.n_missed += n
+            self.scheduler.deadline_missed.emit(task.name, n)
+        try:
+            value = task.getter()
+        except Exception as e:
+            task.active = False
+            # a failed instrument must not serve stale values
+            self.scheduler.cache.remove(task.cache_names())
+            self.scheduler.reading_error.emit(task.name, str(e))
+            return
+        timestamp = time.time()
+        task.last_latency = time.monotonic() - start
+        task.n_reads += 1
+
+        # keep the phase of the schedule, skipping periods that were missed
+        task.next_due += task.interval
+        if task.next_due < start:
+            task.next_due += task.interval * ((start - task.next_due) // task.interval + 1)
+
+        if value is None:
+            return  # nothing new since the last poll
+        if task.fields is None:
+            self.scheduler.cache.update(task.name, value, timestamp)
+        else:
+            for name, field_value in zip(task.cache_names(), value):
+                self.scheduler.cache.update(name, field_value, timestamp)
+        self.scheduler.reading_ready.emit(task.name, value, timestamp)
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._is_running = False
+            self._cond.notify()
+        self.wait()
+
+
+class AcquisitionScheduler(QObject):
+    """
+    Central polling scheduler shared by all instrument panels.
+
+    Panels register a getter with a target interval and priority. Every
+    bus (GPIB board, serial port, TCP host) gets a single worker, so
+    instruments on the same bus never talk over each other and adding an
+    instrument does not add a thread. Readings are published through
+    ``reading_ready(name, value, timestamp)``; a task whose getter raises
+    is deactivated, its cached values are dropped and it is reported
+    through ``reading_error(name, message)``;
+    one returning None has nothing new and publishes nothing.
+    The latest value of every task is also kept in ``cache``, readable
+    from any thread.
+    """
+    reading_ready = pyqtSignal(str, object, float)  # name, value, timestamp
+    reading_error = pyqtSignal(str, str)  # name, error message
+    deadline_missed = pyqtSignal(str, int)  # name, number of missed periods
+
+    def __init__(self):
+        super().__init__()
+        self._tasks = {}
+        self._workers = {}
+        self._lock = threading.Lock()
+        self.cache = LatestValueCache()
+
+    def register(self, name, getter, interval, priority=0, resource=None, fields=None):
+        """
+        Poll ``getter`` every ``interval`` seconds and publish it as ``name``.
+
+        If ``getter`` returns a tuple, ``fields`` names its elements; each
+        is cached separately as f'{name}_{field}'. Registering an existing
+        name replaces the previous task.
+        """
+        self.unregister(name)
+        task = PollTask(name, getter, interval, priority, resource, fields)
+        with self._lock:
+            self._tasks[name] = task
+            worker = self._workers.get(task.bus)
+            if worker is None:
+                worker = BusWorker(self, task.bus)
+                self._workers[task.bus] = worker
+                worker.start()
+        worker.add(task)
+        return task
+
+    def unregister(self, name):
+        """Stop polling ``name``, waiting for a transaction in flight"""
+        with self._lock:
+            task = self._tasks.pop(name, None)
+            worker = self._workers.get(task.bus) if task else None
+        if task is None:
+            return
+        task.active = False
+        with worker.lock:
+            pass
+        worker.wake()
+        # a disconnected instrument must not serve stale values
+        self.cache.remove(task.cache_names())
+
+    def bus_lock(self, resource):
+        """
+        Lock serializing all transactions on the bus of ``resource``.
+
+        Hold it around writes or one-off queries issued outside the
+        scheduler so they do not interleave with polled reads.
+        """
+        bus = bus_of(resource)
+        with self._lock:
+            worker = self._workers.get(bus)
+            if worker is None:
+                worker = BusWorker(self, bus)
+                self._workers[bus] = worker
+                worker.start()
+        return worker.lock
+
+    def set_interval(self, name, interval):
+        with self._lock:
+            task = self._tasks.get(name)
+        if task is not None:
+            task.interval = interval
+
+    def stats(self):
+        """Per task read count, missed deadlines and last latency"""
+        with self._lock:
+            return {name: task.stats() for name, task in self._tasks.items()}
+
+    def stop(self):
+        """Stop every bus worker"""
+        with self._lock:
+            tasks = list(self._tasks.values())
+            workers = list(self._workers.values())
+            self._tasks.clear()
+            self._workers.clear()
+        for task in tasks:
+            task.active = False
+        for worker in workers:
+            worker.stop()
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Return the scheduler shared by the whole application"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AcquisitionScheduler()
+    return _scheduler
@@ -5,7 +5,7 @@ import matplotlib.pyplot as plt
 from IPython.display import clear_output
 
 from qcodes import VisaInstrument
-from qcodes.instrument.parameter import ArrayParameter
+from qcodes.instrument.parameter import ArrayParameter, MultiParameter
 from qcodes.utils.validators import Numbers, Ints, Enum, Strings
 import re
 from typing import Tuple
@@ -13,6 +13,26 @@ from typing import Tuple
 # from MCT_Callibration import MCT_calculator
 # mct = MCT_calculator()
 
+# numbers in the reply to 'CO', e.g. 'C= 74.123456 PF L= 0.00123 NS V= 15.0 V'
+_NUMBER = re.compile(r'\d+\.\d+')
+
+
+class CLVParameter(MultiParameter):
+    """Capacitance, loss and voltage from a single bridge reading"""
+
+    def __init__(self, name, instrument, **kwargs):
+        super().__init__(name,
+                         names=('C', 'L', 'V'),
+                         shapes=((), (), ()),
+                         labels=('Capacitance', 'Loss', 'Voltage'),
+                         units=('pF', '', 'V'),
+                         setpoints=((), (), ()),
+                         instrument=instrument,
+                         **kwargs)
+
+    def get_raw(self):
+        return tuple(self.instrument._read_cv())
+
 
 class AH2500A(VisaInstrument):
     def __init__(self, name, address, initiate_voltage=None, **kwargs):
@@ -52,6 +72,11 @@ class AH2500A(VisaInstrument):
                            get_cmd=self.get_C_L_V,
                           )
 
+        # C, L and V of the same measurement in one transaction
+        self.add_parameter('CLV', parameter_class=CLVParameter)
+        self.C_cv = self.L_cv = self.V_cv = None
+        self.read_time = None
+
         self.add_parameter('Average',
                            label='averaging',
                            get_cmd=self.get_Average,
@@ -72,36 +97,58 @@ class AH2500A(VisaInstrument):
         
 
     def _read_cv(self):
-        # Read the current value
+        """
+        Read C, L and V with one 'CO' query per attempt.
+
+        Failed queries are retried up to max_retries times and replies
+        showing C = 0 (bridge not settled) up to max_unsettled times.
+        The values and the time of the reading are kept in C_cv, L_cv,
+        V_cv and read_time.
+        """
         max_retries = 5
-        for _ in range(max_retries):
+        max_unsettled = 10
+        n_failed = n_unsettled = 0
+        while True:
             try:
                 s = self.ask('CO')
-                break
-            except:
+            except Exception:
                 print('failed reading capacitance\n')
-                pass
-        else:  
-            raise Exception(f"Failed after {max_retries} attempts while self.ask('CO') ")
-        
-        # convert to values
-        self.C_cv = 0
-        while self.C_cv == 0:
-            s = self.ask('CO')
-            self.C_cv, self.L_cv, self.V_cv = float(re.findall(r'\d+\.\d+', s)[0]), float(re.findall(r'\d+\.\d+', s)[1]), float(re.findall(r'\d+\.\d+', s)[2])
+                n_failed += 1
+                if n_failed >= max_retries:
+                    raise Exception(f"Failed after {max_retries} attempts while self.ask('CO') ")
+                continue
+            values = _NUMBER.findall(s)
+            if len(values) >= 3 and float(values[0]) != 0:
+                break
+            n_unsettled += 1
+            if n_unsettled >= max_unsettled:
+                raise Exception(f"No settled reading after {max_unsettled} replies to self.ask('CO'): {s}")
+
+        self.C_cv, self.L_cv, self.V_cv = float(values[0]), float(values[1]), float(values[2])
+        self.read_time = time.time()
         return [self.C_cv, self.L_cv, self.V_cv]
-        
+
+    def read_snapshot(self):
+        """One bridge reading as (C, L, V, timestamp)"""
+        C, L, V = self._read_cv()
+        return C, L, V, self.read_time
+
     def get_C(self):
         return self._read_cv()[0]
 
     def get_L(self):
+        # loss of the last reading, use CLV for a coherent C and L
+        if self.L_cv is None:
+            self._read_cv()
         return self.L_cv
 
     def get_V(self):
+        if self.V_cv is None:
+            self._read_cv()
         return self.V_cv
 
     def get_C_L(self):
-        return self._read_cv()[:1]
+        return self._read_cv()[:2]
 
     def get_C_L_V(self):
         return self._read_cv()
@@ -5,7 +5,7 @@ import logging
 import numpy as np
 
 from qcodes.instrument.visa import VisaInstrument
-from qcodes.instrument.parameter import ArrayParameter
+from qcodes.instrument.parameter import ArrayParameter, MultiParameter
 import qcodes.utils.validators as vals
 
 from qcodes.utils.helpers import create_on_off_val_mapping
@@ -29,6 +29,81 @@ _unit_map = {
 #   pass
 
 
+class SParameterTrace(ArrayParameter):
+    """
+    Complex S-parameter trace 1 of channel 1 against the stimulus frequency.
+
+    The frequency setpoints are read from the instrument once and cached
+    until a sweep setting is changed through the driver.
+    """
+
+    def __init__(self, name, instrument, **kwargs):
+        super().__init__(name, shape=(1,), instrument=instrument,
+                         label='S parameter', unit='dim. less',
+                         setpoint_names=('frequency',),
+                         setpoint_labels=('Frequency',),
+                         setpoint_units=('Hz',),
+                         docstring='Complex trace data, real + 1j*imag',
+                         **kwargs)
+
+    def prepare_trace(self):
+        """
+        Update setpoints and label
+        """
+        freq = self.instrument.get_stimulus()
+        self.setpoints = (freq,)
+        self.shape = (len(freq),)
+        self.label = self.instrument.S_parameter()
+        self.instrument._traceready = True
+
+    def get_raw(self):
+        if not self.instrument._traceready:
+            self.prepare_trace()
+        # trace 1, whose parameter is the label, whichever trace is selected
+        real_data, imag_data = self.instrument.get_real_imaginary_data(trace=1)
+        return real_data + 1j*imag_data
+
+
+class SweepTraces(MultiParameter):
+    """
+    All traces set up with E5071C.configure_traces, from one triggered sweep.
+
+    Getting it triggers the configured channels once, then fetches every
+    trace. Elements are named like 'S21_ch1' and hold complex data against
+    the frequency of their channel, so the parameter can be registered
+    with a QCoDeS Measurement (paramtype='array') and saved in one
+    add_result.
+    """
+
+    def __init__(self, name, instrument, **kwargs):
+        super().__init__(name, names=(), shapes=(), instrument=instrument,
+                         docstring='Complex data of all configured traces',
+                         **kwargs)
+
+    def prepare_traces(self):
+        """
+        Update names and setpoints from the trace configuration
+        """
+        config = self.instrument.trace_config
+        freqs = {ch: self.instrument.get_stimulus(ch) for ch in config}
+        labels = [(ch, s) for ch, s_parameters in config.items() for s in s_parameters]
+        self.names = tuple(f'{s}_ch{ch}' for ch, s in labels)
+        self.labels = tuple(f'{s} (channel {ch})' for ch, s in labels)
+        self.units = ('dim. less',)*len(labels)
+        self.shapes = tuple((len(freqs[ch]),) for ch, _ in labels)
+        self.setpoints = tuple((freqs[ch],) for ch, _ in labels)
+        self.setpoint_names = tuple((f'frequency_ch{ch}',) for ch, _ in labels)
+        self.setpoint_labels = (('Frequency',),)*len(labels)
+        self.setpoint_units = (('Hz',),)*len(labels)
+        self.instrument._tracesready = True
+
+    def get_raw(self):
+        if not self.instrument._tracesready:
+            self.prepare_traces()
+        self.instrument.sweep()
+        return tuple(self.instrument.fetch_traces().values())
+
+
 class E5071C(VisaInstrument):
     """
 Keysight E5071C driver
@@ -44,7 +119,7 @@ Keysight E5071C driver
         self.add_parameter('start_frequency',
                            label='Sweep start frequency',
                            unit='Hz',
-                           set_cmd=':SENS1:FREQ:STAR {}',
+                           set_cmd=partial(self.invalidate_trace, ':SENS1:FREQ:STAR {}'),
                            get_cmd=':SENS1:FREQ:STAR?',
                            get_parser=VISA_str_to_int,
                            vals=vals.Numbers(3e5, 20e9))
@@ -58,14 +133,14 @@ Keysight E5071C driver
         self.add_parameter('sweep_type',
                            label='Sweep Type',
                            get_parser=VISA_str_to_int,
-                           set_cmd=':SENS1:SWE:TYPE {}',
+                           set_cmd=partial(self.invalidate_trace, ':SENS1:SWE:TYPE {}'),
                            get_cmd=':SENS1:SWE:TYPE?')
 
         # Working
         self.add_parameter('stop_frequency',
                            label='Sweep stop frequency',
                            unit='Hz',
-                           set_cmd=':SENS1:FREQ:STOP {}',
+                           set_cmd=partial(self.invalidate_trace, ':SENS1:FREQ:STOP {}'),
                            get_cmd=':SENS1:FREQ:STOP?',
                            get_parser=VISA_str_to_int,
                            vals=vals.Numbers(3e5, 20e9))
@@ -87,7 +162,7 @@ Keysight E5071C driver
                            label='Center frequency',
                            unit='Hz',
                            get_parser=VISA_str_to_int,
-                           set_cmd=':SENS1:FREQ:CENT {}',
+                           set_cmd=partial(self.invalidate_trace, ':SENS1:FREQ:CENT {}'),
                            get_cmd=':SENS1:FREQ:CENT?',
                            vals=vals.Numbers(3e5, 20e9))
 
@@ -95,7 +170,7 @@ Keysight E5071C driver
                            label='Span frequency',
                            unit='Hz',
                            get_parser=VISA_str_to_int,
-                           set_cmd=':SENS1:FREQ:SPAN {}',
+                           set_cmd=partial(self.invalidate_trace, ':SENS1:FREQ:SPAN {}'),
                            get_cmd=':SENS1:FREQ:SPAN?',
                            vals=vals.Numbers(1, 5.9e9))
 
@@ -143,7 +218,7 @@ Keysight E5071C driver
 
         self.add_parameter('npts',
                            label='Number of points in trace',
-                           set_cmd=':SENS1:SWE:POIN {}',
+                           set_cmd=partial(self.invalidate_trace, ':SENS1:SWE:POIN {}'),
                            get_cmd=':SENS1:SWE:POIN?',
                            get_parser=VISA_str_to_int,
                            vals=vals.Ints(1, 100001))
@@ -180,11 +255,21 @@ Keysight E5071C driver
 
         self.add_parameter('S_parameter',
                            label='S_parameter',
-                           set_cmd=':CALC1:PAR1:DEF {}',
+                           set_cmd=partial(self.invalidate_trace, ':CALC1:PAR1:DEF {}'),
                            get_cmd=':CALC1:PAR1:DEF?')
 
         self.add_function('reset', call_cmd='*RST')
 
+        # traces are transferred as ASCII unless set_binary_transfer(True)
+        self.binary_transfer = False
+        self._traceready = False
+        self.add_parameter('trace', parameter_class=SParameterTrace)
+
+        # S parameters per channel measured by sweep() and fetch_traces()
+        self.trace_config = {1: ['S21']}
+        self._tracesready = False
+        self.add_parameter('traces', parameter_class=SweepTraces)
+
         self.add_function('autoscale_trace',
                           call_cmd=':DISP:WIND1:TRAC1:Y:AUTO')
 
@@ -202,6 +287,7 @@ Keysight E5071C driver
         Wrapper for set_cmds that make the trace not ready
         """
         self._traceready = False
+        self._tracesready = False
         self.write(cmd.format(value))
 
     # def start_sweep_all(self):
@@ -230,33 +316,84 @@ Keysight E5071C driver
 
     def prepare_trace(self):
         """
-        Update setpoints, units and labels
+        Update setpoints and label of the trace parameter
         """
 
         # we don't trust users to keep their fingers off the front panel,
-        # so we query the instrument for all values
+        # so call this after changing the sweep there
+        self.trace.prepare_trace()
 
-        fstart = self._instrument.start_freq()
-        fstop = self._instrument.stop_freq()
-        npts = self._instrument.trace_points()
+    def set_binary_transfer(self, on=True):
+        """
+        Transfer traces as 64 bit binary blocks instead of ASCII, which is
+        several times smaller and needs no parsing
+        """
+        self.write(':FORM:DATA REAL' if on else ':FORM:DATA ASC')
+        self.binary_transfer = on
 
-        sps = np.linspace(fstart, fstop, npts)
-        self.setpoints = (tuple(sps), )
-        self.shape = (len(sps), )
+    def _query_trace(self, cmd):
+        """Query a list of numbers in the present transfer format"""
+        if self.binary_transfer:
+            return self.visa_handle.query_binary_values(cmd, datatype='d', is_big_endian=True,
+                                                        container=np.array)
+        return np.array(self.ask(cmd).split(','), dtype=np.double)
 
-        self.label = self._instrument.s_parameter()
-        self.unit = _unit_map[self._instrument.display_format()]
+    def SetActiveTrace(self, trace, ch=1):
+        self.write(f':CALC{ch}:PAR{trace}:SEL')
 
-        self._instrument._traceready = True
+    def configure_traces(self, s_parameters, channels=(1,)):
+        """
+        Set up the traces measured by sweep(), fetch_traces() and the
+        traces parameter.
 
-    def SetActiveTrace(self, mystr, ch=1):
-        # self.write('CALC{}:PAR:SEL "{}"'.format(ch, mystr))
-        self.write('CALC{}:PAR:SEL "{}"')
+        Args:
+            s_parameters: list of S parameters, e.g. ['S11', 'S21'], used
+                for every channel, or a dict {channel: list}
+            channels: channels to use if s_parameters is a list
+        """
+        if not isinstance(s_parameters, dict):
+            s_parameters = {ch: list(s_parameters) for ch in channels}
+        for ch, s_list in s_parameters.items():
+            self.write(f':CALC{ch}:PAR:COUN {len(s_list)}')
+            for trace, s in enumerate(s_list, 1):
+                self.write(f':CALC{ch}:PAR{trace}:DEF {s}')
+        self.trace_config = {ch: list(s_list) for ch, s_list in s_parameters.items()}
+        self._traceready = False
+        # names are needed before the parameter is registered in a Measurement
+        self.traces.prepare_traces()
 
-    def get_real_imaginary_data(self, ch=1):
-        # data_str = self.ask(":CALC1:DATA:SDAT?".format(ch))
-        data_str = self.ask(':CALC1:DATA:SDAT?')
-        data_double = np.array(data_str.split(','), dtype=np.double)
+    def sweep(self):
+        """
+        Trigger one sweep of all configured channels and wait for it
+        """
+        self.write(':TRIG:SOUR BUS')
+        self.write(':TRIG:SCOP ALL')
+        for ch in self.trace_config:
+            self.write(f':INIT{ch}:CONT ON')
+        self.write(':TRIG:SING')
+        self.ask('*OPC?')
+
+    def fetch_traces(self):
+        """
+        Complex data of all configured traces of the last sweep, as
+        {(channel, S parameter): array}
+        """
+        data = {}
+        for ch, s_list in self.trace_config.items():
+            for trace, s in enumerate(s_list, 1):
+                real_data, imag_data = self.get_real_imaginary_data(ch, trace)
+                data[(ch, s)] = real_data + 1j*imag_data
+        return data
+
+    def get_real_imaginary_data(self, ch=1, trace=None):
+        """
+        Real and imaginary part of a trace of channel ch, by default the
+        active one
+        """
+        if trace is None:
+            data_double = self._query_trace(f':CALC{ch}:DATA:SDAT?')
+        else:
+            data_double = self._query_trace(f':CALC{ch}:TRAC{trace}:DATA:SDAT?')
 
         real_data = data_double[::2]
         imag_data = data_double[1::2]
@@ -264,10 +401,7 @@ Keysight E5071C driver
         return real_data, imag_data
 
     def get_stimulus(self, ch=1):
-        # freq = self.ask(':SENS1:FREQ:DATA?'.format(ch))
-        freq = self.ask(':SENS1:FREQ:DATA?')
-        freq = np.asarray([float(xx) for xx in freq.split(',')])
-        return freq
+        return self._query_trace(f':SENS{ch}:FREQ:DATA?')
 
     def on(self):
         self.status('on')
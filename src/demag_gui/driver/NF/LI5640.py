@@ -1,8 +1,4 @@
 from functools import partial
-import numpy as np
-import time
-import matplotlib.pyplot as plt
-from IPython.display import clear_output
 
 from qcodes import VisaInstrument
 from qcodes.instrument.parameter import ArrayParameter
@@ -10,6 +6,8 @@ from qcodes.utils.validators import Numbers, Ints, Enum, Strings
 
 from typing import Tuple
 
+from demag_gui.driver.NF.noise_scan import NoiseScan, frequency_grid, prime_frequencies
+
 
 class LI5640(VisaInstrument):
     """
@@ -193,63 +191,29 @@ class LI5640(VisaInstrument):
 
         return tuple(float(val) for val in output.split(','))
 
-    def optimize_frequency(self, freq_start=3, freq_stop=70, freq_step=0.02, N=10):
-        digit = 1
-        while freq_step%1 != 0:
-            freq_step = freq_step*10
-            digit = digit*10
-        frequencies = np.arange(freq_start*digit, freq_stop*digit, freq_step)/digit
-        prime_frequencies = self._prime_frequencies(frequencies)
-        rmse1 = []
-        rmse2 = []
-        freqs_meas = []
-        DOUT1 = []
-        DOUT2 = []
-        fig, [ax1, ax2, ax3, ax4] = plt.subplots(nrows=4, ncols=1, figsize=(3, 9))
-        for jj, freq in enumerate(prime_frequencies):
-            self.frequency(freq)
-            for ii in range(N):
-                time.sleep(3/freq)
-                freqs_meas.append(self.frequency())
-                temp1, temp2 = self.DOUTs()
-                DOUT1.append(temp1)
-                DOUT2.append(temp2)
-            mean1 = np.array(DOUT1[jj*N:jj*N+N]).mean()
-            rmse1.append(np.sqrt(sum((np.array(DOUT1[jj*N:jj*N+N]) - mean1)**2)/N))
-            mean2 = np.array(DOUT2[jj*N:jj*N+N]).mean()
-            rmse2.append(np.sqrt(sum((np.array(DOUT2[jj*N:jj*N+N]) - mean2)**2)/N))
-            clear_output()
-            print('{:.3f}, {}/{} finished'.format(freq, jj, len(prime_frequencies)))
-        ax1.plot(freqs_meas, DOUT1, '.-')
-        ax1.set_title('Reading of channel 1')
-        ax3.plot(freqs_meas, DOUT2, '.-')
-        ax3.set_title('Reading of channel 2')
-        ax2.plot(prime_frequencies, rmse1, '.-')
-        ax2.set_title('Channel 1 rmse')
-        ax4.plot(prime_frequencies, rmse2, '.-')
-        ax4.set_title('Channel 2 rmse')
-        fig.tight_layout()
-        freq_optimized = prime_frequencies[rmse1.index(min(rmse1))]
-        self.frequency(freq_optimized)
-        print('frequency is set to {}'.format(freq_optimized))
-        plt.figure()
-        plt.plot(freqs_meas, 'd-')
-        return {'frequency': prime_frequencies,
-                'DOUT1': DOUT1,
-                'DOUT2': DOUT2,
-                'rmse1': rmse1,
-                'rmse2': rmse2}
+    def optimize_frequency(self, freq_start=3, freq_stop=70, freq_step=0.02, N=10,
+                           coarse=None, checkpoint=None, stop_callback=None, plot=True):
+        """
+        Set the frequency to the prime frequency with the least noise on channel 1.
 
-    def _prime_frequencies(self, frequencies):
-        digs = [1000, 100, 10, 1]
-        prime_list = []
-        for num in frequencies:
-            for dig in digs:
-                if round(int(num*dig))%10 != 0:
-                    break
-            num = int(num*dig)
-            if all(num % i != 0 for i in range(2, int(np.sqrt(num) + 1))):
-                prime_list.append(num/dig)
-        print(prime_list)
-        return np.array(prime_list)
+        See NoiseScan for N, checkpoint (file to resume an interrupted scan
+        from) and NoiseScan.run for coarse. Returns a NoiseScanResult, or
+        None if stopped before any frequency was measured, in which case
+        the frequency is set back to its value before the scan.
+        """
+        frequencies = self._prime_frequencies(frequency_grid(freq_start, freq_stop, freq_step))
+        initial_frequency = self.frequency()
+        scan = NoiseScan(self.DOUTs, self.frequency, N=N, checkpoint=checkpoint)
+        result = scan.run(frequencies, coarse=coarse, stop_callback=stop_callback)
+        if result is None:
+            self.frequency(initial_frequency)
+            print('stopped before any frequency was measured')
+            return None
+        self.frequency(result.best_frequency)
+        print('frequency is set to {}'.format(result.best_frequency))
+        if plot:
+            result.plot()
+        return result
 
+    def _prime_frequencies(self, frequencies):
+        return prime_frequencies(frequencies)
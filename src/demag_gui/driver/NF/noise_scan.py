@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+def frequency_grid(freq_start=3, freq_stop=70, freq_step=0.02):
+    """Frequencies from freq_start to freq_stop (excluded) in steps of freq_step, without rounding drift"""
+    digit = 1
+    while freq_step % 1 != 0:
+        freq_step = freq_step * 10
+        digit = digit * 10
+    return np.arange(freq_start * digit, freq_stop * digit, freq_step) / digit
+
+
+def prime_frequencies(frequencies, max_decimals=3):
+    """
+    Frequencies whose digits, trailing zeros removed, form a prime number,
+    e.g. 3.07 (307) or 5.3 (53), so they are no simple multiple of mains
+    or other pickup frequencies.
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    digits = np.round(frequencies * 10**max_decimals).astype(np.int64)
+    for _ in range(max_decimals):
+        digits = np.where(digits % 10 == 0, digits // 10, digits)
+    if not len(digits):
+        return frequencies
+
+    # sieve of Eratosthenes up to the largest number
+    is_prime = np.ones(max(digits.max() + 1, 2), dtype=bool)
+    is_prime[:2] = False
+    for i in range(2, int(np.sqrt(len(is_prime))) + 1):
+        if is_prime[i]:
+            is_prime[i*i::i] = False
+    return frequencies[is_prime[digits]]
+
+
+class NoiseScanResult(NamedTuple):
+    """Noise of both lock-in outputs per frequency, sorted by frequency"""
+    frequency: np.ndarray
+    mean1: np.ndarray
+    rmse1: np.ndarray
+    mean2: np.ndarray
+    rmse2: np.ndarray
+    best_frequency: float  # lowest rmse1
+
+    def plot(self):
+        import matplotlib.pyplot as plt
+        fig, axes = plt.subplots(nrows=4, ncols=1, figsize=(3, 9), sharex=True)
+        for ax, data, title in zip(axes, (self.mean1, self.rmse1, self.mean2, self.rmse2),
+                                   ('Reading of channel 1', 'Channel 1 rmse',
+                                    'Reading of channel 2', 'Channel 2 rmse')):
+            ax.plot(self.frequency, data, '.-')
+            ax.set_title(title)
+        axes[1].axvline(self.best_frequency, color='red', ls='--')
+        fig.tight_layout()
+        return fig
+
+
+class NoiseScan:
+    """
+    Measure the noise of a lock-in at a list of frequencies.
+
+    At every frequency ``N`` samples of both outputs are taken with
+    ``read()`` (one transaction returning both channels), ``periods``
+    reference periods apart, and reduced to their mean and rms deviation
+    with NumPy. If ``checkpoint`` is a file name, every finished frequency
+    is saved there and frequencies already in the file are not measured
+    again, so an interrupted scan resumes where it stopped.
+    """
+
+    def __init__(self, read, set_frequency, N=10, periods=3, checkpoint=None):
+        self.read = read
+        self.set_frequency = set_frequency
+        self.N = N
+        self.periods = periods
+        self.checkpoint = checkpoint
+        self.points = {}  # frequency -> (mean1, rmse1, mean2, rmse2)
+        self.frequencies = None  # frequencies of the last run, None for all points
+        if checkpoint and os.path.exists(checkpoint):
+            self._load()
+
+    def _load(self):
+        with open(self.checkpoint) as f:
+            saved = json.load(f)
+        if saved.get('N') == self.N and saved.get('periods') == self.periods:
+            self.points = {float(freq): tuple(values) for freq, values in saved['points'].items()}
+
+    def _save(self):
+        tmp = f'{self.checkpoint}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'N': self.N, 'periods': self.periods,
+                       'points': {repr(freq): values for freq, values in self.points.items()}}, f)
+        os.replace(tmp, self.checkpoint)
+
+    def measure(self, freq):
+        """Mean and rms deviation of both channels at one frequency"""
+        self.set_frequency(freq)
+        samples = np.empty((self.N, 2))
+        for i in range(self.N):
+            time.sleep(self.periods / freq)
+            samples[i] = self.read()
+        mean = samples.mean(axis=0)
+        rmse = samples.std(axis=0)
+        return mean[0], rmse[0], mean[1], rmse[1]
+
+    def _measure_all(self, frequencies, stop_callback):
+        todo = [freq for freq in frequencies if float(freq) not in self.points]
+        for i, freq in enumerate(todo):
+            if stop_callback and stop_callback():
+                return False
+            self.points[float(freq)] = tuple(float(v) for v in self.measure(freq))
+            if self.checkpoint:
+                self._save()
+            print('{:.3f}, {}/{} finished'.format(freq, i + 1, len(todo)), end='\r')
+        return True
+
+    def run(self, frequencies, coarse=None, n_best=3, stop_callback=None):
+        """
+        Scan ``frequencies`` and return a NoiseScanResult, or None if
+        stopped before any of them was measured.
+
+        With ``coarse`` only every coarse-th frequency is measured first,
+        then all frequencies within ``coarse`` grid points of the ``n_best``
+        quietest ones (channel 1). The result holds every frequency
+        measured so far, also when stopped early; points of a checkpoint
+        outside ``frequencies`` are kept in the file but not returned.
+        """
+        frequencies = np.asarray(frequencies)
+        self.frequencies = {float(freq) for freq in frequencies}
+        if coarse and coarse > 1:
+            if self._measure_all(frequencies[::coarse], stop_callback):
+                rmse1 = np.array([self.points.get(float(freq), (0, np.inf))[1] for freq in frequencies])
+                candidates = set()
+                for i in np.argsort(rmse1)[:n_best]:
+                    candidates.update(range(max(i - coarse, 0), min(i + coarse + 1, len(frequencies))))
+                self._measure_all(frequencies[sorted(candidates)], stop_callback)
+        else:
+            self._measure_all(frequencies, stop_callback)
+        if not any(freq in self.frequencies for freq in self.points):
+            return None
+        return self.result()
+
+    def result(self):
+        """NoiseScanResult of the points measured at the frequencies of the last run"""
+        freqs = np.array(sorted(freq for freq in self.points
+                                if self.frequencies is None or freq in self.frequencies))
+        if not len(freqs):
+            raise RuntimeError('no frequency measured yet')
+        values = np.array([self.points[freq] for freq in freqs])
+        return NoiseScanResult(freqs, values[:, 0], values[:, 1], values[:, 2], values[:, 3],
+                               float(freqs[values[:, 1].argmin()]))
@@ -59,6 +59,11 @@ class NMR(VisaInstrument):
             '10min': 9, 
         }
         self.measure_before_read = False
+        # wait for pending operations (*OPC?) before each query; not needed
+        # when reading after the completion event, see read_if_new
+        self.sync_before_read = True
+        self.last_event = 0  # bits seen since event_flags() was last called
+        self.last_reading = None  # (M0, TmK, Background, timestamp)
         
         self.operationstate_valmap = {
             'Idel': 0,
@@ -226,13 +231,17 @@ class NMR(VisaInstrument):
         self.KnownM0_A(KnownM0)
         self.write('NMRCACALC1')
     
+    def _sync(self):
+        if self.sync_before_read:
+            self.ask('*OPC?')
+
     def get_M0(self):
-        self.ask('*OPC?')
+        self._sync()
         s = self.ask('NMRMAGNA?')
         return float(s.split(';')[0])
         
     def get_TmK(self):
-        self.ask('*OPC?')
+        self._sync()
         s = self.ask('NMRTCURIE?')
         return float(s.split(';')[0])
     
@@ -243,17 +252,17 @@ class NMR(VisaInstrument):
         return C/(M0-Bg)
     
     def get_Burst(self):
-        self.ask('*OPC?')
+        self._sync()
         s = self.ask('NMRTXMIT?')
         return float(s.split(';')[0])
 
     def get_Gain(self):
-        self.ask('*OPC?')
+        self._sync()
         s = self.ask('NMRGAIN?')
         return float(s.split(';')[0])
     
     def get_Background(self):
-        self.ask('*OPC?')
+        self._sync()
         s = self.ask('NMRBKG?')
         return float(s.split(';')[0])
 
@@ -272,6 +281,43 @@ class NMR(VisaInstrument):
         """
         return int(self.ask('NMREVENT?'))
 
+    def read_if_new(self):
+        """
+        Fetch M0, TmK and background only if a new measurement completed.
+
+        Polls the NMREVENT register (one short query) and returns None
+        unless bit 6 "MR measurement was completed" is set. The results
+        are then read without *OPC?, since the measurement is known to be
+        done. Returns (M0, TmK, Background, timestamp), timestamp being
+        the time the completion was seen. Reading the register clears it,
+        so its bits are collected in last_event until event_flags() is
+        called.
+        """
+        event = self.get_event()
+        self.last_event |= event
+        if not event & (1 << 6):
+            return None
+        timestamp = time.time()
+        sync, self.sync_before_read = self.sync_before_read, False
+        try:
+            M0 = self.get_M0()
+            TmK = self.get_TmK()
+            background = self.get_Background()
+        finally:
+            self.sync_before_read = sync
+        self.last_reading = (M0, TmK, background, timestamp)
+        return self.last_reading
+
+    def event_flags(self, event=None):
+        """
+        Descriptions of the bits set in an event value, by default those
+        collected in last_event, which is then cleared
+        """
+        if event is None:
+            event, self.last_event = self.last_event, 0
+        return [self.event_mapping[bit] for bit in range(8)
+                if event & (1 << bit) and self.event_mapping[bit] != '0']
+
 
     
     def set_operationstate(self, val):
@@ -60,26 +60,54 @@ class UDP5303(VisaInstrument):
             # print(f'OUTP {val_map[val]}')
             self.write(f'OUTP {val_map[val]}')
         
-    def set_HS(self, status, ts=1, step=0.002, actions=[]):
+    def hs_currents(self, status, step=0.002, I_max=0.5, I_transition=None, window=0.05, fast_step=None):
+        """
+        Currents to step through to switch the heat switch on or off.
+
+        Linear steps of ``step`` A from 0 to ``I_max`` by default. With
+        ``I_transition`` and ``fast_step`` the ramp takes ``fast_step``
+        steps and slows down to ``step`` only within ``window`` A of the
+        superconducting transition.
+        """
+        if I_transition is None or fast_step is None:
+            I_vals = np.arange(0, I_max + step/2, step)
+        else:
+            lo, hi = max(I_transition - window, 0), min(I_transition + window, I_max)
+            I_vals = np.concatenate((np.arange(0, lo, fast_step),
+                                     np.arange(lo, hi, step),
+                                     np.arange(hi, I_max, fast_step), [I_max]))
+        I_vals = np.round(I_vals, 6)
+        if status == 'off':
+            I_vals = I_vals[::-1]
+        return I_vals
+
+    def hs_remaining(self, status, I_now=None, **profile):
+        """Currents still to set from ``I_now`` (read if not given), see hs_currents"""
+        I_vals = self.hs_currents(status, **profile)
+        I_now = self.I() if I_now is None else I_now
+        return I_vals[abs(I_vals - I_now).argmin():]
+
+    def hs_state(self, I, I_max=0.5, tol=1e-3):
+        """'on', 'off' or 'ramping' for a heater current I"""
+        if abs(I - I_max) < tol:
+            return 'on'
+        if abs(I) < tol:
+            return 'off'
+        return 'ramping'
+
+    def set_HS(self, status, ts=1, step=0.002, actions=[], **profile):
         status = status.lower()
         ts = max([ts, 0.1])
         if not status in ['on', 'off']:
             print('input should be on or off')
             return 0
-        I_vals = np.arange(0, 0.501, step)
-        
-        if status == 'off':
-            I_vals = I_vals[::-1]
-
-        I_cv = self.I()
-        I_ind = abs(I_vals - I_cv).argmin()
-
-        for I in I_vals[I_ind:]:
 
+        # the current is set, not measured, so it is only read back at the end
+        for I in self.hs_remaining(status, step=step, **profile):
             self.I(I)
             sleep(ts)
-            print(f'Heater current {self.I()}', end='\r')
-            if len(action) == 0:
+            print(f'Heater current {I:.3f}', end='\r')
+            if len(actions) == 0:
                 sleep(0.1)
             for action in actions:
                 action()
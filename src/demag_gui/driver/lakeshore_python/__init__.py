@@ -1,5 +1,6 @@
 """Python driver for Lake Shore instruments"""
 from .generic_instrument import InstrumentException
+from .query_pipeline import query_many
 from .xip_instrument import XIPInstrumentException
 from .em_power_supply import ElectromagnetPowerSupply, Model643, Model648
 from .teslameter import Teslameter, TeslameterOperationRegister, TeslameterQuestionableRegister, F41, F71
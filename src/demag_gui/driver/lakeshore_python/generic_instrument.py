@@ -90,10 +90,17 @@ class GenericInstrument:
         # Initialize values common to all instruments
         self.device_serial = None
         self.device_tcp = None
+        # bytes received over serial after the last complete response
+        self._rx_buffer = bytearray()
+        # TCP receive buffer, reused for every response; the first _tcp_fill bytes are unread
+        self._tcp_buffer = bytearray(4096)
+        self._tcp_fill = 0
+        self._tcp_settings = None
         self.dut_lock = Lock()
         self.serial_number = None
         self.option_card_serial = None
         self.user_connection = None
+        self._pending_response = None
 
         # Raise an error if multiple connection methods are passed. Otherwise, connect to instrument.
         if ip_address and com_port:
@@ -218,6 +225,20 @@ class GenericInstrument:
         self.device_tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.device_tcp.settimeout(timeout)
         self.device_tcp.connect((ip_address, tcp_port))
+        self._tcp_settings = (ip_address, tcp_port, timeout)
+        self._tcp_fill = 0
+
+        # Queries are short, so send them at once, and let the OS probe idle connections
+        # so that a dropped link is noticed and can be reopened by _tcp_reconnect
+        self.device_tcp.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.device_tcp.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'SIO_KEEPALIVE_VALS'):
+            # Windows: probe after 10 s idle, every 3 s
+            self.device_tcp.ioctl(socket.SIO_KEEPALIVE_VALS, (1, 10000, 3000))
+        elif hasattr(socket, 'TCP_KEEPIDLE'):
+            self.device_tcp.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 10)
+            self.device_tcp.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 3)
+            self.device_tcp.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
 
         # Send the instrument a line break, wait 100ms, and clear the input buffer so that
         # any leftover communications from a prior session don't gum up the works.
@@ -235,6 +256,21 @@ class GenericInstrument:
 
         self.device_tcp.close()
         self.device_tcp = None
+        self._tcp_fill = 0
+
+    def _tcp_reconnect(self):
+        """Close the TCP connection and open it again with the settings of connect_tcp."""
+
+        self.logger.warning('Lost TCP connection to %s, reconnecting', self.serial_number)
+        try:
+            self.device_tcp.close()
+        except OSError:
+            pass
+        try:
+            self.connect_tcp(*self._tcp_settings)
+        except OSError as ex:
+            self.device_tcp = None
+            raise InstrumentException("Unable to reconnect over TCP") from ex
 
     def connect_usb(self, serial_number=None, com_port=None, baud_rate=None, data_bits=None,
                     stop_bits=None, parity=None, timeout=None, handshaking=None, flow_control=None):
@@ -262,6 +298,7 @@ class GenericInstrument:
                         self.device_serial.write(b'\n')
                         sleep(0.1)
                         self.device_serial.reset_input_buffer()
+                        self._rx_buffer.clear()
 
                         break
         else:
@@ -278,32 +315,109 @@ class GenericInstrument:
         self.device_serial = None
 
     def _tcp_command(self, command):
-        """Send a command over the TCP connection."""
+        """Send a command over the TCP connection, reconnecting once if the connection was lost."""
 
-        self.device_tcp.send(command.encode('utf-8') + b'\n')
+        message = command.encode('utf-8') + b'\n'
+        try:
+            self.device_tcp.sendall(message)
+        except socket.timeout as ex:
+            raise InstrumentException("Connection timed out") from ex
+        except OSError:
+            self._tcp_reconnect()
+            self.device_tcp.sendall(message)
+
+    def _send_query(self, query_string):
+        """Send a query without waiting for the response, which is read with _read_response.
+
+            The caller holds dut_lock from sending until the response was read.
+        """
+
+        self._pending_response = None
+        if self.device_serial is not None:
+            self._usb_command(query_string)
+        elif self.device_tcp is not None:
+            self._tcp_command(query_string)
+        elif self.user_connection is not None:
+            # A user provided connection only offers complete queries
+            self._pending_response = self._user_connection_query(query_string)
+        else:
+            raise InstrumentException("No connections configured")
+
+        self.logger.info('Sent query to %s: %s', self.serial_number, query_string)
+
+    def _read_response(self, query_string):
+        """Read the response to a query sent with _send_query."""
+
+        if self._pending_response is not None:
+            response = self._pending_response
+            self._pending_response = None
+        elif self.device_serial is not None:
+            response = self._usb_read_response()
+        elif self.device_tcp is not None:
+            response = self._tcp_read_response(query_string)
+        else:
+            raise InstrumentException("No connections configured")
+
+        self.logger.info('Received response from %s: %s', self.serial_number, response)
+        return response
 
     def _tcp_query(self, query):
         """Query over the TCP connection."""
 
         self._tcp_command(query)
+        return self._tcp_read_response(query)
+
+    def _tcp_read_response(self, query):
+        """Read the response to query, asking again once if the connection was lost."""
+
+        try:
+            response = self._tcp_read_line()
+        except ConnectionError:
+            # The instrument closed or reset the connection before answering, ask again once
+            self._tcp_reconnect()
+            self._tcp_command(query)
+            response = self._tcp_read_line()
+        return response.rstrip()
+
+    def _tcp_read_line(self):
+        """Receive up to the next \\r\\n and return it decoded.
 
-        total_response = ""
+        Data is received directly into a reusable buffer, which is doubled when a response does
+        not fit, and decoded once when the terminator arrived. Bytes received after the
+        terminator are kept for the next response.
+        """
 
-        # Continuously receive data from the buffer until a line break
+        buffer = self._tcp_buffer
+        fill = self._tcp_fill
+        search_start = 0
         while True:
+            end = buffer.find(b'\r\n', search_start, fill)
+            if end >= 0:
+                end += 2
+                with memoryview(buffer) as view:
+                    response = str(view[:end], 'utf-8')
+                # Move the start of the next response to the front
+                buffer[:fill - end] = buffer[end:fill]
+                self._tcp_fill = fill - end
+                return response
+
+            # The terminator may straddle two receives, so search again from the last byte
+            search_start = max(fill - 1, 0)
+            if fill == len(buffer):
+                buffer.extend(bytes(len(buffer)))
 
             # Receive the data and raise an error on timeout
             try:
-                response = self.device_tcp.recv(4096).decode('utf-8')
+                with memoryview(buffer) as view:
+                    n_received = self.device_tcp.recv_into(view[fill:])
             except socket.timeout as ex:
+                # Drop the partial response so it does not prefix the next one
+                self._tcp_fill = 0
                 raise InstrumentException("Connection timed out") from ex
-
-            # Add received information to the response
-            total_response += response
-
-            # Return the response once it ends with a line break
-            if total_response.endswith("\r\n"):
-                return total_response.rstrip()
+            if not n_received:
+                self._tcp_fill = 0
+                raise ConnectionResetError("Connection closed by the instrument")
+            fill += n_received
 
     def _usb_command(self, command):
         """Send a command over the serial USB connection."""
@@ -314,6 +428,11 @@ class GenericInstrument:
         """Query over the serial USB connection."""
 
         self._usb_command(query)
+        return self._usb_read_response()
+
+    def _usb_read_response(self):
+        """Read one response from the serial USB connection."""
+
         response = self._custom_eol_readline().decode('ascii')
 
         # If nothing is returned, raise a timeout error.
@@ -323,17 +442,31 @@ class GenericInstrument:
         return response.rstrip()
 
     def _custom_eol_readline(self):
-        line = bytearray()
+        """Read up to and including the next \\r\\n terminator.
+
+        Everything waiting on the port is read at once into a buffer; bytes after the
+        terminator are kept there for the next call. On timeout the partial line is returned.
+        """
+
+        buffer = self._rx_buffer
+        search_start = 0
         while True:
-            new_character = self.device_serial.read(1)
-            if new_character:
-                line += new_character
-                # Check to see if the last two characters are the terminator characters \r\n
-                if line[-2:] == b'\r\n':
-                    break
-            else:
-                break
-        return bytes(line)
+            end = buffer.find(b'\r\n', search_start)
+            if end >= 0:
+                line = bytes(buffer[:end + 2])
+                del buffer[:end + 2]
+                return line
+
+            # The terminator may straddle two reads, so search again from the last byte
+            search_start = max(len(buffer) - 1, 0)
+
+            # Wait for at least one byte, then take whatever else has arrived
+            chunk = self.device_serial.read(max(1, getattr(self.device_serial, 'in_waiting', 0)))
+            if not chunk:
+                line = bytes(buffer)
+                buffer.clear()
+                return line
+            buffer += chunk
 
     def _user_connection_command(self, command):
         """Send a command over the user provided connection."""
@@ -0,0 +1,68 @@
+"""This module implements pipelined queries to several Lake Shore instruments at once."""
+
+from contextlib import ExitStack
+
+from .generic_instrument import InstrumentException, _parse_response
+
+
+def query_many(requests):
+    """Query several instruments at once and return the responses.
+
+        The queries to every instrument are joined into one compound query, all compound queries are sent
+        and only then are the responses read. The instruments therefore answer in parallel and reading
+        six thermometers on three controllers costs about one round trip instead of six. The connections
+        of the instruments are used as they are and stay open.
+
+        The dut_lock of every instrument involved is held from sending until its response was read. The
+        error queues of the instruments are not checked.
+
+            Args:
+                requests (list[tuple]):
+                    (instrument, query string) pairs. An instrument may appear several times.
+
+            Returns:
+                list[str]: The response to every query, in the order of the requests.
+    """
+
+    # Group the queries per instrument, keeping their positions in the result
+    groups = {}
+    for position, (instrument, query_string) in enumerate(requests):
+        instrument_group = groups.setdefault(id(instrument), (instrument, [], []))
+        instrument_group[1].append(position)
+        instrument_group[2].append(query_string)
+
+    responses = [None] * len(requests)
+    errors = []
+    with ExitStack() as stack:
+        # Always lock in the same order so that concurrent callers cannot deadlock
+        for key in sorted(groups):
+            stack.enter_context(groups[key][0].dut_lock)
+
+        sent = []
+        for instrument, positions, queries in groups.values():
+            query_string = ";:".join(queries)
+            try:
+                instrument._send_query(query_string)
+            except Exception as ex:
+                errors.append(ex)
+            else:
+                sent.append((instrument, positions, queries, query_string))
+
+        # Read every sent query, even after an error, so no response is left for the next query
+        for instrument, positions, queries, query_string in sent:
+            try:
+                response_list = _parse_response(instrument._read_response(query_string))
+            except Exception as ex:
+                errors.append(ex)
+                continue
+            if len(response_list) != len(queries):
+                errors.append(InstrumentException(
+                    f"Expected {len(queries)} responses from {instrument.serial_number}, "
+                    f"received {len(response_list)}"))
+                continue
+            for position, response in zip(positions, response_list):
+                responses[position] = response
+
+    if errors:
+        raise errors[0]
+    return responses
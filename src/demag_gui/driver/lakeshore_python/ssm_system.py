@@ -1,10 +1,12 @@
 """Implements functionality unique to the Lake Shore M81."""
 from datetime import datetime
-import struct
+import re
 from base64 import b64decode
 from threading import Lock
 from warnings import warn
 
+import numpy as np
+
 from .ssm_system_enums import SSMSystemEnums
 from .xip_instrument import XIPInstrument, XIPInstrumentException, RegisterBase
 from .ssm_measure_module import MeasureModule
@@ -19,6 +21,23 @@ except NotImplementedError:
 except KeyError:
     pass  # Proceed without wakepy on linux without dbus
 
+# NumPy types of the struct format characters of a stream row, little-endian with standard sizes
+_BINARY_FORMAT_TYPES = {
+    '?': '?', 'b': 'i1', 'B': 'u1', 'h': '<i2', 'H': '<u2', 'i': '<i4', 'I': '<u4', 'l': '<i4', 'L': '<u4',
+    'q': '<i8', 'Q': '<u8', 'e': '<f2', 'f': '<f4', 'd': '<f8'
+}
+
+
+def _binary_format_dtype(binary_format):
+    """Translates the struct format of a stream row, as returned by BFORmat?, to a NumPy structured dtype."""
+
+    field_types = []
+    for count, code in re.findall(r'(\d*)(\S)', binary_format.lstrip('<')):
+        if code not in _BINARY_FORMAT_TYPES:
+            raise XIPInstrumentException(f'Unsupported binary stream format {binary_format}')
+        field_types += [_BINARY_FORMAT_TYPES[code]] * int(count or 1)
+    return np.dtype([(f'f{i}', field_type) for i, field_type in enumerate(field_types)])
+
 
 class SSMSystemOperationRegister(RegisterBase):
     """Class object representing the operation status register."""
@@ -276,6 +295,28 @@ class SSMSystem(XIPInstrument, SSMSystemEnums):
                 A single row of stream data as a tuple.
         """
 
+        for block in self.stream_data_blocks(rate, num_points, *data_sources):
+            yield from block.tolist()
+
+    def stream_data_blocks(self, rate, num_points, *data_sources):
+        """Generator object to stream data from the instrument in blocks of rows.
+
+            Every chunk received from the instrument is decoded with a single NumPy call into a structured
+            array with one field per column of the row format, named f0, f1, ... The blocks are read-only
+            views of the received data; copy them if they are modified.
+
+            Args:
+                rate (int):
+                    Desired transfer rate in points/sec.
+                num_points (int):
+                    Number of points to return. None to stream indefinitely.
+                data_sources (SSMSystemDataSourceMnemonic or str, int):
+                    Variable length list of pairs of (DATA_SOURCE, CHANNEL_INDEX).
+
+            Yields:
+                numpy.ndarray: The rows of stream data received with one transfer.
+        """
+
         with self.stream_lock:
             with keep.running():
                 self.command('TRACe:RESEt')
@@ -284,7 +325,10 @@ class SSMSystem(XIPInstrument, SSMSystemEnums):
                 self.command(f'TRACe:RATE {rate}')
 
                 bytes_per_row = int(self.query('TRACe:FORMat:ENCOding:B64:BCOunt?'))
-                binary_format = '<' + self.query('TRACe:FORMat:ENCOding:B64:BFORmat?').strip('\"')
+                row_dtype = _binary_format_dtype(self.query('TRACe:FORMat:ENCOding:B64:BFORmat?').strip('\"'))
+                if row_dtype.itemsize != bytes_per_row:
+                    raise XIPInstrumentException(f'Row format of {row_dtype.itemsize} bytes does not match '
+                                                 f'the byte count of {bytes_per_row}.')
 
                 if num_points is not None:
                     self.command(f'TRACe:STARt {num_points}')
@@ -292,24 +336,61 @@ class SSMSystem(XIPInstrument, SSMSystemEnums):
                     self.command('TRACe:STARt')
 
                 num_collected = 0
+                remainder = b''
                 while num_points is None or num_collected < num_points:
                     b64_string = ''
                     while not b64_string:
                         b64_string = self.query('TRACe:DATA:ALL?', check_errors=False)
 
                     new_bytes = b64decode(b64_string)
-                    rows = [new_bytes[i:i + bytes_per_row] for i in range(0, len(new_bytes), bytes_per_row)]
+                    if remainder:
+                        new_bytes = remainder + new_bytes
 
-                    for row in rows:
-                        data = struct.unpack(binary_format, row)
-                        num_collected += 1
+                    # Keep an incomplete row for the next transfer
+                    num_rows = len(new_bytes) // bytes_per_row
+                    if num_points is not None:
+                        num_rows = min(num_rows, num_points - num_collected)
+                    remainder = new_bytes[num_rows * bytes_per_row:]
+                    if not num_rows:
+                        continue
 
-                        yield data
+                    num_collected += num_rows
+                    yield np.frombuffer(new_bytes, dtype=row_dtype, count=num_rows)
 
             overflow_occurred = bool(int(self.query('TRACe:DATA:OVERflow?', check_errors=True)))
             if overflow_occurred:
                 raise XIPInstrumentException('Data loss occurred during this data stream.')
 
+    def get_data_array(self, rate, num_points, *data_sources, out=None):
+        """Like stream_data_blocks, but returns all rows in one structured array.
+
+            Args:
+                rate (int):
+                    Desired transfer rate in points/sec.
+                num_points (int):
+                    Number of points to return.
+                data_sources (SSMSystemDataSourceMnemonic or str, int):
+                    Variable length list of pairs of (DATA_SOURCE, CHANNEL_INDEX).
+                out (numpy.ndarray):
+                    Array of at least num_points rows to fill, e.g. reused between streams. Its fields must
+                    match the row format. A new array is allocated if omitted.
+                    Optional Parameter.
+
+            Returns:
+                numpy.ndarray: The filled rows of out.
+        """
+
+        num_filled = 0
+        for block in self.stream_data_blocks(rate, num_points, *data_sources):
+            if out is None:
+                out = np.empty(num_points, dtype=block.dtype)
+            out[num_filled:num_filled + len(block)] = block
+            num_filled += len(block)
+
+        if out is None:
+            raise XIPInstrumentException('No data received from the stream.')
+        return out[:num_filled]
+
     def get_data(self, rate, num_points, *data_sources):
         """Like stream_data, but returns a list.
 
@@ -1,5 +1,9 @@
 """This module implements a parent class that contains all functionality shared by Lake Shore XIP instruments."""
 
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import serial
 
 from .generic_instrument import GenericInstrument, InstrumentException, RegisterBase, _parse_response
@@ -80,6 +84,11 @@ class XIPInstrument(GenericInstrument):
                  clear_errors_on_init=True,
                  **kwargs):
         # Initialize values common to all XIP instruments
+        self._error_check_policy = ("always", None, None)
+        # Commands sent since the error queue was last read, to name them when it holds errors
+        self._unchecked_commands = deque(maxlen=20)
+        self._unchecked_count = 0
+        self._last_error_check = time.monotonic()
         GenericInstrument.__init__(self, serial_number, com_port, baud_rate, 8, 1, serial.PARITY_NONE, flow_control,
                                    False, timeout, ip_address, tcp_port, **kwargs)
         self.status_byte_register = StatusByteRegister
@@ -88,15 +97,100 @@ class XIPInstrument(GenericInstrument):
         self.questionable_register = None
         if clear_errors_on_init:
             self.command('SYSTem:ERRor:CLEar', check_errors=False)
+            self._unchecked_commands.clear()
+            self._unchecked_count = 0
+
+    def set_error_check_policy(self, policy="always", every=None, interval=None):
+        """Chooses when commands and queries read the SCPI error queue.
+
+            Checking the error queue costs the instrument an extra query and the response an extra parse, so
+            fast polling can defer it. A deferred check is added to the next command or query once it is due,
+            without an extra round trip. The error queue collects the errors of every command since the last
+            check, and a raised exception lists those commands.
+
+            Args:
+                policy (str):
+                    "always" checks with every command and query, "never" only when check_errors=True is
+                    passed, "deferred" every few commands and queries and/or after some time.
+                every (int):
+                    With "deferred", check with every n-th command or query.
+                    Optional Parameter.
+                interval (float):
+                    With "deferred", check with the first command or query after interval seconds.
+                    Optional Parameter.
+        """
+
+        if policy not in ("always", "never", "deferred"):
+            raise ValueError(f"Unknown error check policy {policy!r}")
+        if policy == "deferred" and every is None and interval is None:
+            raise ValueError("A deferred error check needs every and/or interval")
+        self._error_check_policy = (policy, every, interval)
+
+    @contextmanager
+    def error_check_policy(self, policy="deferred", every=None, interval=None):
+        """Uses an error check policy within a with block and checks the remaining errors when leaving it.
+
+            Args:
+                policy (str):
+                    See set_error_check_policy.
+                every (int):
+                    See set_error_check_policy.
+                interval (float):
+                    See set_error_check_policy.
+        """
+
+        previous_policy = self._error_check_policy
+        self.set_error_check_policy(policy, every, interval)
+        try:
+            yield self
+        finally:
+            self._error_check_policy = previous_policy
+        self.check_error_queue()
+
+    def check_error_queue(self):
+        """Reads the SCPI error queue and raises the errors of all commands since the last check."""
+
+        with self.dut_lock:
+            window = self._error_check_window("SYSTem:ERRor:ALL?", True)
+            error_response = self._scpi_query("SYSTem:ERRor:ALL?")
+        self._error_check(error_response, window[:-1])
+
+    def _error_check_window(self, command_string, check_errors):
+        """Decides whether this transaction reads the error queue.
+
+            Called with dut_lock held. Returns the commands since the last check if it does, else None.
+        """
+
+        self._unchecked_commands.append(command_string)
+        self._unchecked_count += 1
 
-    def command(self, *commands, check_errors=True):
+        if check_errors is None:
+            policy, every, interval = self._error_check_policy
+            if policy == "deferred":
+                check_errors = ((every is not None and self._unchecked_count >= every) or
+                                (interval is not None and time.monotonic() - self._last_error_check >= interval))
+            else:
+                check_errors = policy == "always"
+        if not check_errors:
+            return None
+
+        window = list(self._unchecked_commands)
+        if self._unchecked_count > len(window):
+            window.insert(0, f"... {self._unchecked_count - len(window)} more")
+        self._unchecked_commands.clear()
+        self._unchecked_count = 0
+        self._last_error_check = time.monotonic()
+        return window
+
+    def command(self, *commands, check_errors=None):
         """Send an SCPI command or multiple commands to the instrument.
 
             Args:
                 commands (str):
                     Any number of SCPI commands.
                 check_errors (bool):
-                    Chooses whether to query the SCPI error queue and raise errors as exceptions. True by default.
+                    Chooses whether to query the SCPI error queue and raise errors as exceptions. Follows the
+                    error check policy by default, which checks every command unless changed.
                     Optional Parameter.
 
         """
@@ -104,12 +198,12 @@ class XIPInstrument(GenericInstrument):
         # Group all commands into a single string with SCPI delimiters.
         command_string = ";:".join(commands)
 
-        # Pass the string to the query function if it contains a question mark.
-        if check_errors:
-            # Do a query which will automatically check the errors.
-            self.query(command_string)
-        else:
-            with self.dut_lock:
+        with self.dut_lock:
+            window = self._error_check_window(command_string, check_errors)
+            if window is not None:
+                # Do a query which will check the errors.
+                response = self._checked_query(command_string)
+            else:
                 # Send command to the instrument over serial. If serial is not configured, send it over TCP.
                 if self.device_serial is not None:
                     self._usb_command(command_string)
@@ -122,14 +216,18 @@ class XIPInstrument(GenericInstrument):
 
                 self.logger.info('Sent SCPI command to %s: %s', self.serial_number, command_string)
 
-    def query(self, *queries, check_errors=True):
+        if window is not None:
+            self._error_check(_parse_response(response).pop(), window)
+
+    def query(self, *queries, check_errors=None):
         """Sends an SCPI query or multiple queries to the instrument and return the response(s).
 
             Args:
                 queries (str):
                     Any number of SCPI queries or commands.
                 check_errors (bool):
-                    Chooses whether to query the SCPI error queue and raise errors as exceptions. True by default.
+                    Chooses whether to query the SCPI error queue and raise errors as exceptions. Follows the
+                    error check policy by default, which checks every query unless changed.
                     Optional Parameter.
 
             Returns:
@@ -140,42 +238,57 @@ class XIPInstrument(GenericInstrument):
         # Group all commands and queries a single string with SCPI delimiters.
         query_string = ";:".join(queries)
 
-        # Append the query with an additional error buffer query.
-        if check_errors:
-            query_string += ";:SYSTem:ERRor:ALL?"
-
-        # Query the instrument over serial. If serial is not configured, use TCP.
         with self.dut_lock:
-            if self.device_serial is not None:
-                response = self._usb_query(query_string)
-            elif self.device_tcp is not None:
-                response = self._tcp_query(query_string)
-            elif self.user_connection is not None:
-                response = self._user_connection_query(query_string)
+            window = self._error_check_window(query_string, check_errors)
+            if window is not None:
+                response = self._checked_query(query_string)
             else:
-                response = ""
-                raise InstrumentException("No connections configured")
-
-            self.logger.info('Sent SCPI query to %s: %s', self.serial_number, query_string)
-            self.logger.info('Received SCPI response from %s: %s', self.serial_number, response)
+                response = self._scpi_query(query_string)
 
-        if check_errors:
+        if window is not None:
             # Split the responses to each query, remove the last response which is to the error buffer query,
             # and check whether it contains an error
             response_list = _parse_response(response)
             error_response = response_list.pop()
-            self._error_check(error_response)
+            self._error_check(error_response, window)
             response = ';'.join(response_list)
 
         return response
 
+    def _checked_query(self, query_string):
+        """Sends a query with an appended error buffer query, with dut_lock held."""
+
+        return self._scpi_query(query_string + ";:SYSTem:ERRor:ALL?")
+
+    def _scpi_query(self, query_string):
+        """Sends a query over the configured connection, with dut_lock held."""
+
+        # Query the instrument over serial. If serial is not configured, use TCP.
+        if self.device_serial is not None:
+            response = self._usb_query(query_string)
+        elif self.device_tcp is not None:
+            response = self._tcp_query(query_string)
+        elif self.user_connection is not None:
+            response = self._user_connection_query(query_string)
+        else:
+            raise InstrumentException("No connections configured")
+
+        self.logger.info('Sent SCPI query to %s: %s', self.serial_number, query_string)
+        self.logger.info('Received SCPI response from %s: %s', self.serial_number, response)
+
+        return response
+
     @staticmethod
-    def _error_check(error_response):
+    def _error_check(error_response, window=None):
         """Evaluates the instrument response."""
 
         # If the error buffer returns an error, raise an exception with that includes the error.
         if "No error" not in error_response:
-            raise XIPInstrumentException("SCPI command error(s): " + error_response)
+            message = "SCPI command error(s): " + error_response
+            # Name the commands the errors may come from if more than the last one was unchecked
+            if window is not None and len(window) > 1:
+                message += " in the commands since the last check: " + " | ".join(window)
+            raise XIPInstrumentException(message)
 
     def get_status_byte(self):
         """Returns named bits of the status byte register and their values."""
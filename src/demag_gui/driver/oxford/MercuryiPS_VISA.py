@@ -1,6 +1,7 @@
+import threading
 import time
 from functools import partial
-from typing import Dict, Union, Optional, Callable, List, cast
+from typing import Dict, Union, Optional, Callable, List, NamedTuple, cast
 import logging
 from distutils.version import LooseVersion
 
@@ -52,6 +53,20 @@ def _signal_parser(our_scaling: float, response: str) -> float:
     return float(digits)*their_scaling*our_scaling
 
 
+class MercuryPSStatus(NamedTuple):
+    """
+    Readback values of one power supply, fetched together by
+    MercuryWorkerPS.status
+    """
+    field_persistent: float  # T
+    field: float  # T
+    ramp_status: str  # 'HOLD', 'TO SET', 'CLAMP' or 'TO ZERO'
+    heater_switch: str  # 'ON' or 'OFF'
+    field_target: float  # T
+    field_ramp_rate: float  # T/s
+    timestamp: float  # time.time() when the replies were received
+
+
 class MercuryWorkerPS(InstrumentChannel):
     """
     Class to hold a worker power supply for the MercuryiPS
@@ -155,6 +170,96 @@ class MercuryWorkerPS(InstrumentChannel):
                                         'CLAMP': 'CLMP',
                                         'TO ZERO': 'RTOZ'})
 
+    # signal, parameter it updates and parser, in the order of MercuryPSStatus
+    _status_signals = (
+        ('SIG:PFLD', 'field_persistent', partial(_signal_parser, 1)),
+        ('SIG:FLD', 'field', partial(_signal_parser, 1)),
+        ('ACTN', 'ramp_status', _response_preparser),
+        ('SIG:SWHT', None, _response_preparser),
+        ('SIG:FSET', 'field_target', partial(_signal_parser, 1)),
+        ('SIG:RFST', 'field_ramp_rate', partial(_signal_parser, 1/60)),
+    )
+
+    def status(self) -> MercuryPSStatus:
+        """
+        Read all readback values of this PS in one exchange.
+
+        The READ commands are sent as one burst and the replies read back
+        in order, so the whole status costs a single round trip instead of
+        one per value. The cached values of the corresponding parameters
+        are updated as well.
+        """
+        cmds = [f"READ:DEV:{self.uid}:{self.psu_string}:{signal}"
+                for signal, _, _ in self._status_signals]
+        resps = self._parent.ask_many(cmds)
+        timestamp = time.time()
+
+        values = []
+        for (_, name, parser), resp in zip(self._status_signals, resps):
+            value = parser(resp)
+            if name == 'ramp_status':
+                value = self.ramp_status.inverse_val_mapping[value]
+            if name is not None:
+                self.parameters[name].cache.set(value)
+            values.append(value)
+        return MercuryPSStatus(*values, timestamp)
+
+    def is_ramping(self, status: Optional[MercuryPSStatus] = None) -> bool:
+        status = self.status() if status is None else status
+        return status.ramp_status in ('TO SET', 'TO ZERO')
+
+    def ramp_time_left(self, status: MercuryPSStatus) -> float:
+        """
+        Estimated time in s until the ramp in progress reaches its target
+        """
+        target = 0 if status.ramp_status == 'TO ZERO' else status.field_target
+        if status.field_ramp_rate <= 0:
+            return float('inf')
+        return abs(target - status.field) / status.field_ramp_rate
+
+    def wait_for_ramp(self,
+                      stop_callback: Optional[Callable[[], bool]] = None,
+                      progress_callback: Optional[Callable[[MercuryPSStatus, float], None]] = None,
+                      lock=None,
+                      sleep: Callable[[float], None] = time.sleep,
+                      min_interval: float = 0.1,
+                      max_interval: float = 5.) -> bool:
+        """
+        Block until this PS has finished ramping.
+
+        The status is polled at a rate adapted to the time left: a quarter
+        of the estimated remaining time, clipped to [min_interval,
+        max_interval], so long ramps cost few queries and the end of a ramp
+        is still caught promptly.
+
+        Args:
+            stop_callback: polled between queries, the wait ends early
+                (without touching the ramp) when it returns True
+            progress_callback: called with the status and the estimated
+                time left after every poll
+            lock: held around every query, e.g. the bus lock of the
+                scheduler, so other readers can use the connection in
+                between
+            sleep: used to wait between polls
+
+        Returns:
+            True if the ramp finished, False if stopped
+        """
+        while True:
+            if stop_callback and stop_callback():
+                return False
+            if lock is None:
+                status = self.status()
+            else:
+                with lock:
+                    status = self.status()
+            time_left = self.ramp_time_left(status)
+            if progress_callback:
+                progress_callback(status, time_left)
+            if not self.is_ramping(status):
+                return True
+            sleep(min(max(time_left / 4, min_interval), max_interval))
+
     def ramp_to_target(self) -> None:
         """
         Unconditionally ramp this PS to its target
@@ -251,6 +356,10 @@ class MercuryiPS(VisaInstrument):
             raise ValueError('Incorrect VISA resource name. Must be of type '
                              'TCPIP0::XXX.XXX.XXX.XXX::7020::SOCKET.')
 
+        # held for every exchange, so a query from another thread cannot
+        # take one of the responses of ask_many
+        self._comm_lock = threading.RLock()
+
         super().__init__(name, address, terminator='\n', visalib=visalib,
                          **kwargs)
 
@@ -448,8 +557,7 @@ class MercuryiPS(VisaInstrument):
                 raise RuntimeError(f"Expected a MercuryWorkerPS but got "
                                    f"{type(worker)}")
             # wait for the ramp to finish, we don't care about the order
-            while worker.ramp_status() == 'TO SET':
-                time.sleep(0.1)
+            worker.wait_for_ramp()
 
         self.update_field()
 
@@ -469,8 +577,7 @@ class MercuryiPS(VisaInstrument):
             if self.visabackend == 'sim':
                 pass
             else:
-                while worker.ramp_status() == 'TO SET':
-                    time.sleep(0.1)
+                worker.wait_for_ramp()
 
         self.update_field()
 
@@ -563,10 +670,35 @@ class MercuryiPS(VisaInstrument):
             cmd: the command to send to the instrument
         """
 
-        visalog.debug(f"Writing to instrument {self.name}: {cmd}")
-        resp = self.visa_handle.query(cmd)
-        visalog.debug(f"Got instrument response: {resp}")
+        with self._comm_lock:
+            visalog.debug(f"Writing to instrument {self.name}: {cmd}")
+            resp = self.visa_handle.query(cmd)
+            visalog.debug(f"Got instrument response: {resp}")
 
+        return self._strip_response(cmd, resp)
+
+    def ask_many(self, cmds: List[str]) -> List[str]:
+        """
+        Send several commands in one write and read their responses in
+        order. Responses are stripped as in ask.
+
+        Args:
+            cmds: the commands to send to the instrument
+        """
+        with self._comm_lock:
+            visalog.debug(f"Writing to instrument {self.name}: {cmds}")
+            self.visa_handle.write(self.visa_handle.write_termination.join(cmds))
+            try:
+                resps = [self.visa_handle.read() for _ in cmds]
+            except Exception:
+                # do not leave unread responses behind for the next query
+                self.device_clear()
+                raise
+            visalog.debug(f"Got instrument responses: {resps}")
+
+        return [self._strip_response(cmd, resp) for cmd, resp in zip(cmds, resps)]
+
+    def _strip_response(self, cmd: str, resp: str) -> str:
         if 'INVALID' in resp:
             log.error('Invalid command. Got response: {}'.format(resp))
             base_resp = resp
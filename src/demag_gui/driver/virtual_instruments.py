@@ -1,7 +1,9 @@
 # virtual_instruments.py
 import random
+import time
 from qcodes import VisaInstrument
 from qcodes import Instrument
+from qcodes.instrument.channel import InstrumentChannel
 
 class NMR(Instrument):
     def __init__(self, name, address, **kwargs):
@@ -10,6 +12,16 @@ class NMR(Instrument):
         self.add_parameter('TmK', get_cmd=self._ramdn)
         self.add_parameter('KnownM0_A', get_cmd=self._ramdn)
         self.add_parameter('KnownT_A', get_cmd=self._ramdn)
+        self.add_parameter('Background', get_cmd=self._ramdn)
+        self._last_reading = 0
+
+    def read_if_new(self):
+        # a new measurement every 2 s, like the real one in auto mode
+        now = time.time()
+        if now - self._last_reading < 2:
+            return None
+        self._last_reading = now
+        return self.M0(), self.TmK(), self.Background(), now
 
     def _ramdn(self):
         return random.uniform(73, 74.55)
@@ -26,6 +38,13 @@ class AH2500A(Instrument):
             'L',
             get_cmd=self.get_L
         )
+        self.add_parameter(
+            'CLV',
+            get_cmd=self.get_CLV
+        )
+
+    def get_CLV(self):
+        return self.get_C(), self.get_L(), 1.0
 
     def get_C(self):
         return random.uniform(73, 74.55)
@@ -42,10 +61,29 @@ class MLP:
     def close(self):
         pass
 
+class MercuryWorkerPS(InstrumentChannel):
+    def __init__(self, parent, name):
+        super().__init__(parent, name)
+        self.add_parameter('field_target', initial_value=0., get_cmd=None, set_cmd=None)
+        self.add_parameter('field_ramp_rate', initial_value=0.001, get_cmd=None, set_cmd=None)
+        self.add_parameter('ramp_status', initial_value='HOLD', get_cmd=None, set_cmd=None)
+        self.add_parameter('heater_switch', initial_value='OFF', get_cmd=None, set_cmd=None)
+        self.add_parameter('field', get_cmd=self._ramdn)
+        self.add_parameter('field_persistent', get_cmd=self._ramdn)
+
+    def _ramdn(self):
+        return random.uniform(0, 0.01)
+
+    def status(self):
+        from demag_gui.driver.oxford.MercuryiPS_VISA import MercuryPSStatus
+        return MercuryPSStatus(self.field_persistent(), self.field(), self.ramp_status(),
+                               self.heater_switch(), self.field_target(),
+                               self.field_ramp_rate(), time.time())
+
 class OxfordMercuryiPS(Instrument):
     def __init__(self, name, address, **kwargs):
         super().__init__(name, **kwargs)
-        pass
+        self.add_submodule('GRPZ', MercuryWorkerPS(self, 'GRPZ'))
 
 
     def close(self):
@@ -0,0 +1,56 @@
+# demag_monitor.py
+from PyQt5.QtWidgets import *
+from demag_gui.core.scheduler import get_scheduler
+from demag_gui.utils.DemagCalculator import LiveDemagAnalyzer
+
+
+class DemagMonitorPanel(QGroupBox):
+    """Live demag analysis of the readings polled by the MCT, NMR and MIPS panels"""
+
+    def __init__(self, mct_calc):
+        super().__init__("Demag")
+        self.setFixedHeight(60)
+        self.mct_calc = mct_calc  # calibration of the MCT panel
+        self.analyzer = None
+        self.scheduler = get_scheduler()
+        self.scheduler.reading_ready.connect(self.on_reading)
+        self.setup_ui()
+        self.reset()
+
+    def setup_ui(self):
+        layout = QHBoxLayout()
+        layout.setSpacing(2)
+
+        self.value_labels = {}
+        for key, text in (('Tmct_mK', "T (mK):"),
+                          ('Tideal_mK', "T ideal (mK):"),
+                          ('dBdt_abs', "dB/dt (mT/min):"),
+                          ('Pheat', "P heat (uW):")):
+            layout.addWidget(QLabel(text))
+            self.value_labels[key] = QLabel("N/A")
+            layout.addWidget(self.value_labels[key])
+
+        layout.addWidget(QLabel("NMR points:"))
+        self.nmr_label = QLabel("0")
+        layout.addWidget(self.nmr_label)
+
+        self.reset_btn = QPushButton("Reset")
+        self.reset_btn.clicked.connect(self.reset)
+        layout.addWidget(self.reset_btn)
+
+        self.setLayout(layout)
+
+    def reset(self):
+        """Start a new analysis, e.g. at the beginning of a demag"""
+        self.analyzer = LiveDemagAnalyzer(mct=self.mct_calc)
+        for label in self.value_labels.values():
+            label.setText("N/A")
+        self.nmr_label.setText("0")
+
+    def on_reading(self, name, value, timestamp):
+        self.analyzer.feed(name, value, timestamp)
+        if name != 'mct' or self.analyzer.latest is None:
+            return
+        for key, label in self.value_labels.items():
+            label.setText(f"{self.analyzer.latest[key]:.3f}")
+        self.nmr_label.setText(str(len(self.analyzer.nmr_points)))
@@ -1,39 +1,21 @@
 # hs_control.py
 from PyQt5 import Qt
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QThread, pyqtSignal
-
-class HSReadingThread(QThread):
-    reading_ready = pyqtSignal(float, str, str)  # current, output_state, heater_state
-    reading_error = pyqtSignal(str)
-
-    def __init__(self, hs_instrument):
-        super().__init__()
-        self.hs = hs_instrument
-        self._is_running = True
-
-    def run(self):
-        while self._is_running:
-            try:
-                current = self.hs.I()
-                output_state = "on" if hasattr(self.hs, 'output_state') else "Unknown"
-                heater_state = "on" if hasattr(self.hs, 'heater_state') else "Unknown"
-
-                self.reading_ready.emit(current, output_state, heater_state)
-                self.msleep(1000)
-            except Exception as e:
-                self.reading_error.emit(str(e))
-                break
-
-    def stop(self):
-        self._is_running = False
-        self.wait()
+from demag_gui.core.ramp import start_stepped_ramp
+from demag_gui.core.scheduler import get_scheduler
 
 class HSControlPanel(QGroupBox):
     def __init__(self):
         super().__init__("HS")
         self.hs_instrument = None
-        self.hs_thread = None
+        self.hs_ramp = None  # RampHandle of the heat switch ramp in progress
+        self.hs_ramp_target = None  # 'on' or 'off', state the last ramp was heading to
+        # current profile and time per step of the heat switch ramp, see UDP5303.hs_currents
+        self.ramp_profile = {'step': 0.002}
+        self.ramp_interval = 1.  # in s
+        self.scheduler = get_scheduler()
+        self.scheduler.reading_ready.connect(self.on_reading)
+        self.scheduler.reading_error.connect(self.on_reading_error)
         self.setFixedHeight(120)
         self.setup_ui()
 
@@ -111,10 +93,8 @@ class HSControlPanel(QGroupBox):
             self.output_btn.setEnabled(True)
             self.heater_btn.setEnabled(True)
 
-            self.hs_thread = HSReadingThread(self.hs_instrument)
-            self.hs_thread.reading_ready.connect(self.update_readings)
-            self.hs_thread.reading_error.connect(self.handle_reading_error)
-            self.hs_thread.start()
+            self.scheduler.register('hs', self.read_hs, 1, resource=str_input,
+                                    fields=('I', 'output_state', 'heater_state'))
 
             self.connect_btn.setText("Disconnect")
             self.status_label.setText("Running")
@@ -127,9 +107,8 @@ class HSControlPanel(QGroupBox):
 
     def disconnect_hs(self):
         try:
-            if self.hs_thread:
-                self.hs_thread.stop()
-                self.hs_thread = None
+            self.stop_heater_ramp()
+            self.scheduler.unregister('hs')
 
             if self.hs_instrument:
                 self.hs_instrument.close()
@@ -168,23 +147,76 @@ class HSControlPanel(QGroupBox):
             QMessageBox.warning(self, "Output Error", f"Failed to toggle output: {str(e)}")
 
     def toggle_heater(self):
-        pass
-    #     if not self.hs_instrument:
-    #         return
-
-    #     try:
-    #         current_text = self.heater_btn.text().lower()
-    #         if current_text == "on":
-    #             self.hs_instrument.set_HS('off')
-    #             self.heater_btn.setText("OFF")
-    #             self.heater_btn.setStyleSheet("background-color: lightgray;")
-    #         else:
-    #             self.hs_instrument.set_HS('on')
-    #             self.heater_btn.setText("ON")
-    #             self.heater_btn.setStyleSheet("background-color: lightgreen;")
-
-    #     except Exception as e:
-    #         QMessageBox.warning(self, "Heater Error", f"Failed to toggle heater: {str(e)}")
+        """Ramp the heat switch to the other state, or stop the ramp in progress"""
+        if not self.hs_instrument:
+            return
+        if self.hs_ramp and not self.hs_ramp.done():
+            self.stop_heater_ramp()
+            return
+
+        try:
+            current = self.heater_current()
+            status = self.next_heater_state(current)
+            if status is None:
+                return
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                currents = self.hs_instrument.hs_remaining(status, current, **self.ramp_profile)
+            self.hs_ramp = start_stepped_ramp(self.scheduler, 'hs_ramp', self.hs_instrument.I,
+                                              currents, self.ramp_interval,
+                                              resource=self.addr_input.text())
+            self.hs_ramp_target = status
+            self.heater_btn.setText("Stop")
+            self.heater_btn.setStyleSheet("background-color: khaki;")
+
+        except Exception as e:
+            QMessageBox.warning(self, "Heater Error", f"Failed to toggle heater: {str(e)}")
+
+    def heater_current(self):
+        """Latest polled heater current, read from the supply if none was polled yet"""
+        current, _ = self.scheduler.cache.get('hs_I')
+        if current is None:
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                current = self.hs_instrument.I()
+        return current
+
+    def next_heater_state(self, current):
+        """State to ramp to: the other one, the target of a stopped ramp, or asked, None if cancelled"""
+        state = self.hs_instrument.hs_state(current)
+        if state in ("on", "off"):
+            return "off" if state == "on" else "on"
+        if self.hs_ramp_target is not None:
+            return self.hs_ramp_target
+
+        answer = QMessageBox.question(self, "Heat Switch",
+                                      "The heat switch is partially ramped. Ramp it ON?\n"
+                                      "Choose No to ramp it OFF.",
+                                      QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+        if answer == QMessageBox.Cancel:
+            return None
+        return "on" if answer == QMessageBox.Yes else "off"
+
+    def stop_heater_ramp(self):
+        if self.hs_ramp and not self.hs_ramp.done():
+            self.hs_ramp.cancel()
+            self.status_label.setText("Ramp stopped")
+            self.status_label.setStyleSheet("color: orange")
+
+    def read_hs(self):
+        """Polled by the scheduler on the serial port of the supply"""
+        current = self.hs_instrument.I()
+        output_state = "on" if hasattr(self.hs_instrument, 'output_state') else "Unknown"
+        heater_state = self.hs_instrument.hs_state(current)
+        return current, output_state, heater_state
+
+    def on_reading(self, name, value, timestamp):
+        if name == 'hs':
+            self.update_readings(*value)
+        elif name == 'hs_ramp':
+            self.update_ramp_progress(*value)
+
+    def on_reading_error(self, name, error_msg):
+        if name == 'hs':
+            self.handle_reading_error(error_msg)
 
     def update_readings(self, current, output_state, heater_state):
         self.current_display.setText(f"{current:.3f} A")
@@ -196,29 +228,33 @@ class HSControlPanel(QGroupBox):
             self.output_btn.setText("OFF")
             self.output_btn.setStyleSheet("background-color: lightgray;")
 
-        if heater_state == "on":
+        if self.hs_ramp and not self.hs_ramp.done():
+            pass  # the button stops the ramp
+        elif heater_state == "on":
             self.heater_btn.setText("ON")
             self.heater_btn.setStyleSheet("background-color: lightgreen;")
         elif heater_state == "off":
             self.heater_btn.setText("OFF")
             self.heater_btn.setStyleSheet("background-color: lightgray;")
-
-        if self.hs_thread:
-            self.hs_thread = HSReadingThread(self.hs_instrument)
-            self.hs_thread.reading_ready.connect(self.update_readings)
-            self.hs_thread.reading_error.connect(self.handle_reading_error)
-            self.hs_thread.start()
+        elif heater_state == "ramping":
+            self.heater_btn.setText("--")
+            self.heater_btn.setStyleSheet("background-color: khaki;")
+
+    def update_ramp_progress(self, current, step, n_steps):
+        self.status_label.setText(f"Ramping {step}/{n_steps}")
+        self.status_label.setStyleSheet("color: blue")
+        if step == n_steps:
+            self.status_label.setText("Running")
+            self.status_label.setStyleSheet("color: green")
 
     def handle_reading_error(self, error_msg):
         QMessageBox.warning(self, "HS Reading Error", f"Error reading HS values: {str(error_msg)}")
         self.current_display.setText("Error")
 
         if self.hs_instrument:
-            self.hs_thread = HSReadingThread(self.hs_instrument)
-            self.hs_thread.reading_ready.connect(self.update_readings)
-            self.hs_thread.reading_error.connect(self.handle_reading_error)
-            self.hs_thread.start()
+            self.scheduler.register('hs', self.read_hs, 1, resource=self.addr_input.text(),
+                                    fields=('I', 'output_state', 'heater_state'))
 
     def close(self):
-        if self.hs_thread:
-            self.hs_thread.stop()
\ No newline at end of file
+        self.stop_heater_ramp()
+        self.scheduler.unregister('hs')
\ No newline at end of file
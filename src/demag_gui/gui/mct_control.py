@@ -1,53 +1,33 @@
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QFont
 import pyqtgraph as pg
-import numpy as np
-from datetime import datetime
+from demag_gui.core.history import MultiResolutionHistory
+from demag_gui.core.scheduler import get_scheduler
 from demag_gui.utils.DemagCalculator import MctCalculator
 
-class MCTReadingThread(QThread):
-    reading_ready = pyqtSignal(float, float, float, float)  # cap, loss, temp_low, timestamp
-    reading_error = pyqtSignal(str)
-    
-    def __init__(self, mct_instrument, mct_calc):
-        super().__init__()
-        self.mct = mct_instrument
-        self.mct_calc = mct_calc
-        self._is_running = True
-    
-    def run(self):
-        while self._is_running:
-            try:
-                cap_value = self.mct.C()
-                loss_value = self.mct.L()
-                t_low = self.mct_calc.C2T_low(cap_value)
-                timestamp = datetime.now().timestamp()
-                
-                self.reading_ready.emit(cap_value, loss_value, t_low, timestamp)
-                self.msleep(100)
-            except Exception as e:
-                self.reading_error.emit(str(e))
-                break
-    
-    def stop(self):
-        self._is_running = False
-        self.wait()
-
 class MCTControlPanel(QWidget):
     def __init__(self):
         super().__init__()
         self.mct_calc = MctCalculator()
         self.mct_instrument = None
-        self.mct_thread = None
+        self.scheduler = get_scheduler()
+        self.scheduler.reading_ready.connect(self.on_reading)
+        self.scheduler.reading_error.connect(self.on_reading_error)
         
         # Data storage
-        self.cap_data = []
-        self.temp_data = []
-        self.time_data = []
-        self.max_points = 1000
+        # Raw data for the last ~3 hours at 10 Hz, min/max tiers for the whole run
+        self.max_points = 10**5
+        self.data = MultiResolutionHistory(self.max_points, channels=('capacitance', 'temperature'))
+        self.t0 = None  # timestamp of the first reading
         self.graph_type = "capacitance"
-        
+
+        # Redraw at display rate, not at sample rate
+        self.plot_dirty = False
+        self.plot_timer = QTimer(self)
+        self.plot_timer.timeout.connect(self.refresh_plot)
+        self.plot_timer.start(50)
+
         self.setup_ui()
     
     def setup_ui(self):
@@ -171,8 +151,15 @@ class MCTControlPanel(QWidget):
         # Show grid with gray color
         self.plot.showGrid(x=True, y=True, alpha=0.3)
         
+        # Only draw what is visible, reduced to about one point per pixel
+        self.plot.setClipToView(True)
+        self.plot.setDownsampling(auto=True, mode='peak')
+
         # Create curve with black line
         self.curve = self.plot.plot(pen=pg.mkPen('k', width=2))
+
+        # Query the history again for the new range on zoom and pan
+        self.plot.getViewBox().sigXRangeChanged.connect(self.on_view_changed)
         
         group.setLayout(layout)
         return group
@@ -190,15 +177,12 @@ class MCTControlPanel(QWidget):
             from demag_gui.driver.virtual_instruments import AH2500A
             self.mct_instrument = AH2500A('mct', str_input)
             
-            self.mct_thread = MCTReadingThread(self.mct_instrument, self.mct_calc)
-            self.mct_thread.reading_ready.connect(self.update_readings)
-            self.mct_thread.reading_error.connect(self.handle_reading_error)
-            self.mct_thread.start()
-            
             # Clear previous data
-            self.cap_data.clear()
-            self.temp_data.clear()
-            self.time_data.clear()
+            self.data.clear()
+            self.t0 = None
+
+            self.scheduler.register('mct', self.read_mct, 0.1, priority=1, resource=str_input,
+                                    fields=('C', 'L', 'T'))
             
             self.connect_btn.setText("Disconnect")
             self.status_label.setText("Running")
@@ -211,10 +195,8 @@ class MCTControlPanel(QWidget):
     
     def disconnect_mct(self):
         try:
-            if self.mct_thread:
-                self.mct_thread.stop()
-                self.mct_thread = None
-            
+            self.scheduler.unregister('mct')
+
             if self.mct_instrument:
                 self.mct_instrument.close()
                 self.mct_instrument = None
@@ -226,24 +208,31 @@ class MCTControlPanel(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Disconnect Failed", f"Failed to disconnect from MCT: {str(e)}")
     
+    def read_mct(self):
+        """Polled by the scheduler on the bus of the bridge"""
+        # C and L of the same bridge reading
+        cap_value, loss_value, _ = self.mct_instrument.CLV()
+        t_low = self.mct_calc.C2T_low(cap_value)
+        return cap_value, loss_value, t_low
+
+    def on_reading(self, name, value, timestamp):
+        if name == 'mct':
+            self.update_readings(*value, timestamp)
+
+    def on_reading_error(self, name, error_msg):
+        if name == 'mct':
+            self.handle_reading_error(error_msg)
+
     def update_readings(self, cap_value, loss_value, temp_low, timestamp):
         # Update display
         self.cap_display.setText(f"{cap_value:.6f}")
         self.loss_display.setText(f"{loss_value:.4f}")
         self.temp_display.setText(f"{temp_low:.4f}")
-        # Store data
-        self.cap_data.append(cap_value)
-        self.temp_data.append(temp_low)
-        self.time_data.append(timestamp)
-        
-        # Keep only recent data
-        if len(self.cap_data) > self.max_points:
-            self.cap_data.pop(0)
-            self.temp_data.pop(0)
-            self.time_data.pop(0)
-        
-        # Update plot
-        self.update_plot()
+        # Store data, time relative to the first reading
+        if self.t0 is None:
+            self.t0 = timestamp
+        self.data.append(timestamp - self.t0, cap_value, temp_low)
+        self.plot_dirty = True
     
     def handle_reading_error(self, error_msg):
         QMessageBox.warning(self, "MCT Reading Error", f"Error reading MCT values: {error_msg}")
@@ -263,18 +252,32 @@ class MCTControlPanel(QWidget):
         
         self.update_plot()
     
+    def refresh_plot(self):
+        if self.plot_dirty and self.isVisible():
+            self.update_plot()
+
+    def on_view_changed(self):
+        # Ranges set by auto range follow the data and need no new query
+        if not self.plot.getViewBox().autoRangeEnabled()[0]:
+            self.plot_dirty = True
+
     def update_plot(self):
-        if not self.time_data:
+        self.plot_dirty = False
+        if not len(self.data):
             return
-        
-        x = np.array(self.time_data) - self.time_data[0]  # Relative time
-        if self.graph_type == "capacitance":
-            y = np.array(self.cap_data)
-        else:  # temperature
-            y = np.array(self.temp_data)
-        
+
+        # Whole run while following the data, otherwise the visible range,
+        # at about two points per pixel
+        view_box = self.plot.getViewBox()
+        max_points = 2 * max(int(view_box.width()), 1000)
+        if view_box.autoRangeEnabled()[0]:
+            x, y = self.data.query(self.graph_type, max_points=max_points)
+        else:
+            t0, t1 = view_box.viewRange()[0]
+            span = t1 - t0
+            x, y = self.data.query(self.graph_type, t0 - span, t1 + span, max_points=3 * max_points)
         self.curve.setData(x, y)
     
     def close(self):
-        if self.mct_thread:
-            self.mct_thread.stop()
\ No newline at end of file
+        self.plot_timer.stop()
+        self.scheduler.unregister('mct')
\ No newline at end of file
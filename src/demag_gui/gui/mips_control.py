@@ -1,45 +1,6 @@
 # mips_control.py (modified heater switch and added checks)
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QThread, pyqtSignal
-
-
-class MIPSReadingThread(QThread):
-    """Thread for reading MIPS instrument data continuously"""
-    mips_reading_ready = pyqtSignal(float, float, str, str, float,
-                                    float)  # persistent field, output field, ramp status, heater switch, target field, rate
-    mips_reading_error = pyqtSignal(str)  # Error signal
-
-    def __init__(self, mips_instrument):
-        super().__init__()
-        self.mips = mips_instrument  # MIPS instrument instance
-        self._is_running = True  # Thread running flag
-
-    def run(self):
-        """Main thread execution - read data every 500ms"""
-        while self._is_running:
-            try:
-                # Read all required parameters from instrument
-                field_persistent = self.mips.GRPZ.field_persistent()
-                field_output = self.mips.GRPZ.field()
-                ramp_status = self.mips.GRPZ.ramp_status()
-                heater_switch = self.mips.GRPZ.heater_switch()
-                field_target_cv = self.mips.GRPZ.field_target()
-                field_rate_cv = self.mips.GRPZ.field_ramp_rate() * 60  # Convert to T/min
-
-                # Emit data to main thread
-                self.mips_reading_ready.emit(
-                    field_persistent, field_output, ramp_status, heater_switch,
-                    field_target_cv, field_rate_cv
-                )
-                self.msleep(500)  # Wait 500ms
-            except Exception as e:
-                self.mips_reading_error.emit(str(e))
-                break
-
-    def stop(self):
-        """Stop the reading thread"""
-        self._is_running = False
-        self.wait()
+from demag_gui.core.scheduler import get_scheduler
 
 
 class MIPSControlPanel(QGroupBox):
@@ -48,7 +9,9 @@ class MIPSControlPanel(QGroupBox):
     def __init__(self):
         super().__init__("MIPS")
         self.mips_instrument = None  # MIPS instrument instance
-        self.mips_thread = None  # Reading thread instance
+        self.scheduler = get_scheduler()  # Shared polling scheduler
+        self.scheduler.reading_ready.connect(self.on_reading)
+        self.scheduler.reading_error.connect(self.on_reading_error)
         self.setFixedHeight(320)  # Increased height for new buttons
 
         self.setup_ui()
@@ -232,7 +195,7 @@ class MIPSControlPanel(QGroupBox):
             self.disconnect_mips()
 
     def connect_mips(self):
-        """Connect to MIPS instrument and start reading thread"""
+        """Connect to MIPS instrument and start polling"""
         str_input = self.addr_input.text()
         try:
             from demag_gui.driver.virtual_instruments import OxfordMercuryiPS
@@ -257,11 +220,10 @@ class MIPSControlPanel(QGroupBox):
             except:
                 pass  # Use defaults if reading fails
 
-            # Start reading thread
-            self.mips_thread = MIPSReadingThread(self.mips_instrument)
-            self.mips_thread.mips_reading_ready.connect(self.update_readings)
-            self.mips_thread.mips_reading_error.connect(self.handle_reading_error)
-            self.mips_thread.start()
+            # Start polling every 500ms
+            self.scheduler.register('mips', self.read_mips, 0.5, resource=str_input,
+                                    fields=('field_persistent', 'field', 'ramp_status',
+                                            'heater_switch', 'field_target', 'field_ramp_rate'))
 
             # Update UI state
             self.connect_btn.setText("Disconnect")
@@ -274,12 +236,10 @@ class MIPSControlPanel(QGroupBox):
             self.status_label.setStyleSheet("color: red")
 
     def disconnect_mips(self):
-        """Disconnect from MIPS instrument and stop reading thread"""
+        """Disconnect from MIPS instrument and stop polling"""
         try:
-            # Stop reading thread
-            if self.mips_thread:
-                self.mips_thread.stop()
-                self.mips_thread = None
+            # Stop polling
+            self.scheduler.unregister('mips')
 
             # Close instrument connection
             if self.mips_instrument:
@@ -311,10 +271,11 @@ class MIPSControlPanel(QGroupBox):
 
         try:
             target_value = float(self.target_sv_input.text())
-            self.mips_instrument.GRPZ.field_target(target_value)
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                self.mips_instrument.GRPZ.field_target(target_value)
 
-            # Update CV display
-            updated_target = self.mips_instrument.GRPZ.field_target()
+                # Update CV display
+                updated_target = self.mips_instrument.GRPZ.field_target()
             self.target_cv_display.setText(f"{updated_target}")
 
         except ValueError:
@@ -329,10 +290,11 @@ class MIPSControlPanel(QGroupBox):
 
         try:
             rate_value = float(self.rate_sv_input.text())
-            self.mips_instrument.GRPZ.field_ramp_rate(rate_value / 60)
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                self.mips_instrument.GRPZ.field_ramp_rate(rate_value / 60)
 
-            # Update CV display
-            updated_rate = self.mips_instrument.GRPZ.field_ramp_rate() * 60
+                # Update CV display
+                updated_rate = self.mips_instrument.GRPZ.field_ramp_rate() * 60
             self.rate_cv_display.setText(f"{updated_rate}")
 
         except ValueError:
@@ -350,7 +312,8 @@ class MIPSControlPanel(QGroupBox):
             return
 
         try:
-            self.mips_instrument.GRPZ.ramp_status('TO SET')
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                self.mips_instrument.GRPZ.ramp_status('TO SET')
             QMessageBox.information(self, "Success", "Ramp status set to TO SET")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to set ramp status: {str(e)}")
@@ -361,7 +324,8 @@ class MIPSControlPanel(QGroupBox):
             return
 
         try:
-            self.mips_instrument.GRPZ.ramp_status('TO ZERO')
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                self.mips_instrument.GRPZ.ramp_status('TO ZERO')
             QMessageBox.information(self, "Success", "Ramp status set to TO ZERO")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to set ramp status: {str(e)}")
@@ -372,11 +336,32 @@ class MIPSControlPanel(QGroupBox):
             return
 
         try:
-            self.mips_instrument.GRPZ.ramp_status('TO HOLD')
+            with self.scheduler.bus_lock(self.addr_input.text()):
+                self.mips_instrument.GRPZ.ramp_status('TO HOLD')
             QMessageBox.information(self, "Success", "Ramp status set to HOLD")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to set ramp status: {str(e)}")
 
+    def read_mips(self):
+        """Read all displayed parameters in one exchange, polled by the scheduler"""
+        status = self.mips_instrument.GRPZ.status()
+        return (
+            status.field_persistent,
+            status.field,
+            status.ramp_status,
+            status.heater_switch,
+            status.field_target,
+            status.field_ramp_rate * 60,  # Convert to T/min
+        )
+
+    def on_reading(self, name, value, timestamp):
+        if name == 'mips':
+            self.update_readings(*value)
+
+    def on_reading_error(self, name, error_msg):
+        if name == 'mips':
+            self.handle_reading_error(error_msg)
+
     def update_readings(self, field_persistent, field_output, ramp_status, heater_switch,
                         field_target_cv, field_rate_cv):
         """Update UI with new instrument readings"""
@@ -412,10 +397,9 @@ class MIPSControlPanel(QGroupBox):
             self.heater_btn.setStyleSheet(f"font-weight: bold; color: black; font-size: {font_size}pt;")
 
     def handle_reading_error(self, error_msg):
-        """Handle reading thread errors"""
+        """Handle polling errors"""
         QMessageBox.warning(self, "MIPS Reading Error", f"Error reading MIPS values: {error_msg}")
 
     def close(self):
         """Clean up when closing panel"""
-        if self.mips_thread:
-            self.mips_thread.stop()
\ No newline at end of file
+        self.scheduler.unregister('mips')
\ No newline at end of file
@@ -1,32 +1,6 @@
 # nmr_control.py
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QThread, pyqtSignal
-import time
-
-
-class NMRContinuousReader(QThread):
-    """Continuous reader for M0 and T values every 5 seconds"""
-    values_ready = pyqtSignal(float, float)  # M0, T
-    error = pyqtSignal(str)
-
-    def __init__(self, nmr_instrument):
-        super().__init__()
-        self.nmr = nmr_instrument
-        self._running = True
-
-    def run(self):
-        while self._running:
-            try:
-                time.sleep(2)  # Wait 5 seconds
-                m0 = self.nmr.M0()
-                t = self.nmr.TmK()
-                self.values_ready.emit(m0, t)
-            except Exception as e:
-                self.error.emit(str(e))
-                break
-
-    def stop(self):
-        self._running = False
+from demag_gui.core.scheduler import get_scheduler
 
 
 class NMRControlPanel(QGroupBox):
@@ -34,7 +8,9 @@ class NMRControlPanel(QGroupBox):
         super().__init__("NMR")
         self.setFixedHeight(150)
         self.nmr = None
-        self.reader = None
+        self.scheduler = get_scheduler()
+        self.scheduler.reading_ready.connect(self.on_reading)
+        self.scheduler.reading_error.connect(self.on_reading_error)
         self.setup_ui()
 
     def setup_ui(self):
@@ -132,10 +108,9 @@ class NMRControlPanel(QGroupBox):
             self.set_buttons_enabled(True)
 
             # Start continuous reading
-            self.reader = NMRContinuousReader(self.nmr)
-            self.reader.values_ready.connect(self.update_readings)
-            self.reader.error.connect(self.handle_error)
-            self.reader.start()
+            # only the event register is polled, results are fetched when a measurement completed
+            self.scheduler.register('nmr', self.read_nmr, 1, resource=self.addr_input.text(),
+                                    fields=('M0', 'TmK', 'Background', 'time'))
 
             # Get initial known values
             self.get_known_values()
@@ -148,10 +123,7 @@ class NMRControlPanel(QGroupBox):
             QMessageBox.warning(self, "Connection Failed", str(e))
 
     def disconnect_nmr(self):
-        if self.reader:
-            self.reader.stop()
-            self.reader.wait()
-            self.reader = None
+        self.scheduler.unregister('nmr')
 
         if self.nmr:
             self.nmr.close()
@@ -167,6 +139,18 @@ class NMRControlPanel(QGroupBox):
         self.known_m0_input.clear()
         self.known_t_input.clear()
 
+    def read_nmr(self):
+        """Polled by the scheduler on the bus of the NMR"""
+        return self.nmr.read_if_new()
+
+    def on_reading(self, name, value, timestamp):
+        if name == 'nmr':
+            self.update_readings(*value[:2])
+
+    def on_reading_error(self, name, error_msg):
+        if name == 'nmr':
+            self.handle_error(error_msg)
+
     def update_readings(self, m0, t):
         self.m0_label.setText(f"{m0:.3f}")
         self.t_label.setText(f"{t:.2f}")
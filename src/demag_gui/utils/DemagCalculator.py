@@ -1,35 +1,79 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import importlib.resources
+import qcodes as qc
 from scipy.signal import savgol_filter
 from scipy.signal import find_peaks
 from qcodes.dataset.data_set import load_by_id
 import xarray as xa
 
-def load_time_measurements(run_ids):
-    dses = [load_by_id(run_id=run_id).to_xarray_dataset() for run_id in run_ids]
-    for ii, ds in enumerate(dses):
-        if 'index' in ds.dims:
-            ds = ds.swap_dims({'index': 't'}).drop_vars('index')
-        # print(ds.dims)
-        ds['ellapstime'] = (list(ds.dims), ds[list(ds.dims)[0]].data)
-        base_time = pd.to_datetime(ds.attrs['run_timestamp'])
-        timestamps = np.asarray([base_time + pd.Timedelta(seconds=s) for s in ds.t.data])
-        # ds['tmin'] = (ds.dims, (timestamps - timestamps[0])/1e9/60)
-        dses[ii] = ds.assign_coords(t=timestamps)
+def _load_run(run_id):
+    ds = load_by_id(run_id=run_id).to_xarray_dataset()
+    if 'index' in ds.dims:
+        ds = ds.swap_dims({'index': 't'}).drop_vars('index')
+    ds['ellapstime'] = (list(ds.dims), ds[list(ds.dims)[0]].data)
+    # absolute time stamps from the run start, in one array operation
+    base_time = np.datetime64(pd.to_datetime(ds.attrs['run_timestamp']), 'ns')
+    offsets = np.round(np.asarray(ds.t.data, dtype=float)*1e9).astype('timedelta64[ns]')
+    return ds.assign_coords(t=base_time + offsets)
+
+
+def load_time_measurements(run_ids, cache_dir=None, max_workers=4):
+    """
+    Load and merge time traces of several runs along t.
+
+    Runs are read in parallel. If ``cache_dir`` is given, the merged
+    dataset of finished runs is stored there as NetCDF, keyed by the
+    database file and the run ids, and read back directly next time.
+    """
+    run_ids = list(run_ids)
+    cache_file = None
+    if cache_dir is not None:
+        db = os.path.abspath(qc.config.core.db_location)
+        key = hashlib.sha1(f"{db}:{run_ids}".encode()).hexdigest()[:16]
+        cache_file = Path(cache_dir) / f"runs_{run_ids[0]}-{run_ids[-1]}_{key}.nc"
+        if cache_file.exists():
+            with xa.open_dataset(cache_file) as cached:
+                return cached.load()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        dses = list(pool.map(_load_run, run_ids))
     # return xa.concat(dses, dim='t').rename_dims({'t': 'time'})
     ds = xa.concat(dses, dim='t')
-    ts = [float(t - ds.t.data[0])/1e9/60 for t in ds.t.data]
+    ts = (ds.t.data - ds.t.data[0])/np.timedelta64(1, 's')/60
     ds['time'] = (
         ds.dims, ts, dict(unit='min')
     )
+
+    # only finished runs are cached, running ones still grow
+    if cache_file is not None and all(load_by_id(run_id=run_id).completed for run_id in run_ids):
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            ds.to_netcdf(cache_file)
+        except Exception as e:
+            print(f'failed to cache runs {run_ids}: {e}')
     return ds
 
+def _horner(coeffs, x):
+    """np.polyval for one float with the coefficients as a list, without NumPy overhead"""
+    y = 0.
+    for c in coeffs:
+        y = y*x + c
+    return y
+
+
 class MctCalculator:
-    def __init__(self, C_Pdata=None):
+    def __init__(self, C_Pdata=None, T_tol=1e-10, max_iter=60):
         self.C_Pdata = C_Pdata
+        # error bound (in K) and iteration limit of the C -> T inversion
+        self.T_tol = T_tol
+        self.max_iter = max_iter
         # calculate the P-T curve
-        coe_PT = [
+        self.coe_PT = np.asarray([
             -1.3855442e-12,
             4.5557026e-9,
             -6.4430869e-6,
@@ -43,12 +87,13 @@ class MctCalculator:
             -6.9443767e1,
             2.6833087e1,
             -4.5875709
-        ]
-        poly = np.arange(-3, 10)    
+        ])
+        self.poly_PT = np.arange(-3, 10)
+        # P(T) = Q(T)/T**3 with Q an ordinary polynomial, evaluated by Horner
+        self.coe_Q = self.coe_PT[::-1]
+        self.dcoe_Q = np.polyder(self.coe_Q)
         T_theory = np.logspace(-3.1, 0.1, 2000)
-        P_theory = np.asarray([
-            coe*T_theory**p for coe, p in zip(coe_PT, poly)
-        ]).sum(axis=0)
+        P_theory = self.P_T(T_theory)
 
         self.T_min = 315.24
         self.P_min = 2.93113
@@ -81,8 +126,10 @@ class MctCalculator:
 
         self.deg = deg
         self.coe_origin = np.polyfit(self.P_mea, self.Cinv_mea, deg=self.deg)
+        self.coe_active = self.coe_origin
         self.df['Cinv_interp'] = np.polyval(self.coe_origin, self.df['P_theory'])
         self.df['C_interp'] = 1/self.df['Cinv_interp']
+        self._build_tables()
 
     def recalibrate(self, new_points):
         """
@@ -151,37 +198,169 @@ class MctCalculator:
 
         # Convert back to descending powers for np.polyval
         self.coe_calibrated = coeffs_asc_new[::-1]
+        self.coe_active = self.coe_calibrated
         self.df['Cinv_interp'] = np.polyval(self.coe_calibrated, self.df['P_theory'])
         self.df['C_interp'] = 1/self.df['Cinv_interp']
+        self._build_tables()
         return coeffs_asc_new[::-1]
 
-    
-    def C2T_low(self, C_cv):
-        x, y = self.df['C_interp'][:self.Pmin_ind].values, self.df['T_theory'][:self.Pmin_ind].values
+    @staticmethod
+    def _sorted_table(x, y):
+        # np.interp needs increasing x
         if x[-1] < x[0]:
             x = x[::-1]
             y = y[::-1]
-        T_low = np.interp(C_cv, x, y)
-        return 1e3*T_low
+        return np.ascontiguousarray(x), np.ascontiguousarray(y)
+
+    def _build_tables(self):
+        """
+        Precompute the C -> T and C -> P lookup tables of both branches.
+
+        Called whenever the calibration changes, so the conversions only
+        run np.interp on ready NumPy arrays.
+        """
+        C = self.df['C_interp'].values
+        T = self.df['T_theory'].values
+        P = self.df['P_theory'].values
+        self.C2T_low_table = self._sorted_table(C[:self.Pmin_ind], T[:self.Pmin_ind])
+        self.C2T_high_table = self._sorted_table(C[self.Pmin_ind:], T[self.Pmin_ind:])
+
+        mask = C[:self.Pmin_ind] < 75
+        self.C2P_low_table = self._sorted_table(C[:self.Pmin_ind][mask], P[:self.Pmin_ind][mask])
+
+        # float copies of the polynomials for _invert_scalar
+        self._poly_lists = (self.coe_active.tolist(), np.polyder(self.coe_active).tolist(),
+                            self.coe_Q.tolist(), self.dcoe_Q.tolist())
+
     
+    def P_T(self, T):
+        """Melting pressure (MPa) from the analytic P(T) polynomial, T in K"""
+        T = np.asarray(T, dtype=float)
+        return np.polyval(self.coe_Q, T)/T**3
+
+    def dPdT(self, T):
+        T = np.asarray(T, dtype=float)
+        return (np.polyval(self.dcoe_Q, T) - 3*np.polyval(self.coe_Q, T)/T)/T**3
+
+    def T2C(self, T_cv):
+        """Capacitance at T_cv (mK) with the active calibration"""
+        return 1/np.polyval(self.coe_active, self.P_T(np.asarray(T_cv)/1000))
+
+    def _invert(self, C_cv, table):
+        """
+        Solve 1/C = g(P(T)) for T on one branch.
+
+        The lookup table gives the starting point and a bracket. Newton
+        steps on the analytic polynomials refine it; steps leaving the
+        bracket fall back to bisection, so every element converges to
+        within ``T_tol``. C outside the table is clamped, as np.interp does.
+        """
+        x, y = table
+        C_cv = np.asarray(C_cv, dtype=float)
+        T = np.array(np.interp(C_cv, x, y))
+        inside = (C_cv > x[0]) & (C_cv < x[-1])
+        if not np.any(inside):
+            return T
+
+        C = C_cv[inside]
+        i = np.searchsorted(x, C)
+        lo, hi = np.minimum(y[i - 1], y[i]), np.maximum(y[i - 1], y[i])
+        target = 1/C
+        dcoe = np.polyder(self.coe_active)
+
+        T_in = T[inside]
+        f_lo = np.polyval(self.coe_active, self.P_T(lo)) - target
+        for _ in range(self.max_iter):
+            P = self.P_T(T_in)
+            f = np.polyval(self.coe_active, P) - target
+            df = np.polyval(dcoe, P)*self.dPdT(T_in)
+
+            # shrink the bracket around the root
+            low_side = np.sign(f) == np.sign(f_lo)
+            lo = np.where(low_side, T_in, lo)
+            f_lo = np.where(low_side, f, f_lo)
+            hi = np.where(low_side, hi, T_in)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                T_new = T_in - f/df
+            outside = ~((T_new > lo) & (T_new < hi))
+            T_new = np.where(outside, 0.5*(lo + hi), T_new)
+
+            converged = (np.abs(T_new - T_in) < self.T_tol) | (hi - lo < self.T_tol)
+            T_in = T_new
+            if np.all(converged):
+                break
+
+        T[inside] = T_in
+        return T
+
+    def _invert_scalar(self, C_cv, table):
+        """
+        _invert for a single reading, with the same safeguarded Newton
+        steps on Python floats, about 20x faster than the array version
+        for one value.
+        """
+        x, y = table
+        C_cv = float(C_cv)
+        if not x[0] < C_cv < x[-1]:
+            return float(np.interp(C_cv, x, y))
+
+        i = int(np.searchsorted(x, C_cv))
+        x0, x1, y0, y1 = float(x[i - 1]), float(x[i]), float(y[i - 1]), float(y[i])
+        T = y0 + (y1 - y0)*(C_cv - x0)/(x1 - x0)
+        lo, hi = min(y0, y1), max(y0, y1)
+        coe, dcoe, coe_Q, dcoe_Q = self._poly_lists
+        target = 1/C_cv
+
+        f_lo = _horner(coe, _horner(coe_Q, lo)/lo**3) - target
+        for _ in range(self.max_iter):
+            Q = _horner(coe_Q, T)
+            P = Q/T**3
+            f = _horner(coe, P) - target
+            if f == 0:
+                return T
+            df = _horner(dcoe, P)*(_horner(dcoe_Q, T) - 3*Q/T)/T**3
+
+            # shrink the bracket around the root
+            if (f > 0) == (f_lo > 0):
+                lo, f_lo = T, f
+            else:
+                hi = T
+
+            T_new = T - f/df if df else 0.5*(lo + hi)
+            if not lo < T_new < hi:
+                T_new = 0.5*(lo + hi)
+
+            converged = abs(T_new - T) < self.T_tol or hi - lo < self.T_tol
+            T = T_new
+            if converged:
+                break
+        return T
+
+    def C2T_low(self, C_cv):
+        # C_cv can be a scalar or an array of any shape, T in mK
+        if np.ndim(C_cv) == 0:
+            return 1e3*self._invert_scalar(C_cv, self.C2T_low_table)
+        return 1e3*self._invert(C_cv, self.C2T_low_table)
+
     def C2T_high(self, C_cv):
-        x, y = self.df['C_interp'][self.Pmin_ind:].values, self.df['T_theory'][self.Pmin_ind:].values
-        if x[-1] < x[0]:
-            x = x[::-1]
-            y = y[::-1]
-        T_low = np.interp(C_cv, x, y)
-        return 1e3*T_low
+        if np.ndim(C_cv) == 0:
+            return 1e3*self._invert_scalar(C_cv, self.C2T_high_table)
+        return 1e3*self._invert(C_cv, self.C2T_high_table)
+
+    def check_inversion(self, T_cv, branch='low'):
+        """
+        Largest deviation (mK) of C2T from the analytic curve at T_cv (mK).
+
+        Should stay below 1e3*T_tol (T_tol is in K) wherever C(T) is
+        monotonic, i.e. away from the Pmin minimum and inside the
+        calibrated range.
+        """
+        C2T = self.C2T_low if branch == 'low' else self.C2T_high
+        return np.max(np.abs(C2T(self.T2C(T_cv)) - np.asarray(T_cv)))
 
     def C2P_low(self, C_cv):
-        x, y = self.df['C_interp'].values[:self.Pmin_ind], self.df['P_theory'].values[:self.Pmin_ind]
-        mask = x < 75
-        x = x[mask]
-        y = y[mask]
-        if x[-1] < x[0]:
-            x = x[::-1]
-            y = y[::-1]
-        P = np.interp(C_cv, x, y)
-        return P
+        return np.interp(C_cv, *self.C2P_low_table)
     
     def T2P(self, T_cv):
         T_cv = T_cv/1000
@@ -212,6 +391,16 @@ def cal_Q(T_K, B=0., cal_dQdt=False, t=[]):
         return dQ*1e6 # in uJ
 
 
+def cal_Cn(T, B):
+    # heat capacity of nuclear stage, T in K, B in T, in J/K
+    n = 100  # in mol
+    lambda_n_mu = 3.22e-6  # in
+
+    gamma_e = 0.691e-3  # in J/mol/K^2
+    N = 159.3  # in mol
+    return n * lambda_n_mu * (B / T) ** 2 + N*gamma_e*T
+
+
 def process_demag_data(ds, Bi=8.2, mct=None):
     try:
         ds = ds.swap_dims({'t': 'mips_GRPZ_field_persistent'})
@@ -243,15 +432,6 @@ def process_demag_data(ds, Bi=8.2, mct=None):
         ds['M0'] = (['Bnmr'], ds.nmr_M0.data[peaks])
         ds['Tnmr'] = (['Bnmr'], Tnmr, dict(long_name=r'T$_{\mathrm{nmr}}$', unit='mK'))
 
-    n = 100  # in mol
-    lambda_n_mu = 3.22e-6  # in
-
-    gamma_e = 0.691e-3  # in J/mol/K^2
-    N = 159.3  # in mol
-
-    def cal_Cn(T, B):
-        return n * lambda_n_mu * (B / T) ** 2 + N*gamma_e*T
-
     def cal_Pdemag(T, B, Ti, Bi, dBdt):
         return cal_Cn(T, B) * Ti * dBdt / Bi
 
@@ -289,6 +469,152 @@ def process_demag_data(ds, Bi=8.2, mct=None):
 
     return ds
 
+
+class CausalLinearFit:
+    """
+    Causal replacement of savgol_filter(y, window, 1) for streaming data.
+
+    Fits a line to the last ``window`` (t, y) points and returns its value
+    and slope at the newest point. The least squares sums are updated in
+    O(1) per sample and recomputed from the window every ``10*window``
+    samples to stop rounding errors from accumulating.
+    """
+
+    def __init__(self, window=71):
+        self.window = window
+        self.t = np.zeros(window)
+        self.y = np.zeros(window)
+        self.t_ref = None  # times are taken relative to the first sample
+        self.n = 0
+        self._sums = np.zeros(5)  # St, Sy, Stt, Sty, count
+
+    def _recompute(self):
+        k = min(self.n, self.window)
+        t, y = self.t[:k], self.y[:k]
+        self._sums[:] = t.sum(), y.sum(), t @ t, t @ y, k
+
+    def push(self, t, y):
+        """Add a point, return (value, slope) at t or (nan, nan) until the window is full"""
+        if self.t_ref is None:
+            self.t_ref = t
+        t = t - self.t_ref
+        i = self.n % self.window
+        sums = self._sums
+        if self.n >= self.window:
+            t_old, y_old = self.t[i], self.y[i]
+            sums -= (t_old, y_old, t_old*t_old, t_old*y_old, 1)
+        self.t[i], self.y[i] = t, y
+        sums += (t, y, t*t, t*y, 1)
+        self.n += 1
+        if self.n % (10*self.window) == 0:
+            self._recompute()
+
+        if self.n < self.window:
+            return np.nan, np.nan
+        St, Sy, Stt, Sty, k = sums
+        det = k*Stt - St*St
+        if det <= 0:
+            return Sy/k, np.nan
+        slope = (k*Sty - St*Sy)/det
+        return (Sy - slope*St)/k + slope*t, slope
+
+
+class LiveDemagAnalyzer:
+    """
+    Streaming version of process_demag_data for use during a demag.
+
+    Readings are consumed one at a time, either through ``update`` or
+    directly from the acquisition scheduler by connecting ``feed`` to
+    ``reading_ready``. Smoothing and derivatives use causal linear fits
+    over the same 71 point window as the offline analysis; NMR points are
+    taken when the NMR temperature changes. Every update costs O(1).
+    """
+
+    def __init__(self, Bi=8.2, mct=None, window=71, nmr_distance=100):
+        if mct is None:
+            mct = MctCalculator()
+            mct.recalibrate([[65.06, mct.P_min]])
+        self.mct = mct
+        self.Bi_target = Bi
+        self.nmr_distance = nmr_distance
+        self.T_fit = CausalLinearFit(window)
+        self.B_fit = CausalLinearFit(window)
+
+        self.B = np.nan  # latest persistent field from the magnet supply
+        self.nmr = None  # latest (M0, T_mK) from the NMR
+        self.C_last = None
+        self.Ti = self.Bi = None
+        self.n = 0
+        self._last_nmr_T = None
+        self._last_nmr_n = -nmr_distance
+        self.nmr_points = []
+        self.latest = None
+
+    def feed(self, name, value, timestamp):
+        """Slot for AcquisitionScheduler.reading_ready"""
+        if name == 'mips':
+            self.B = value[0]
+        elif name == 'nmr':
+            self.nmr = value[:2]
+        elif name == 'mct' and np.isfinite(self.B):
+            self.update(timestamp, value[0], self.B)
+
+    def update(self, t, C, B, nmr=None):
+        """
+        Add one reading, t in s, C in pF, B in T, nmr as (M0, T_mK).
+
+        Returns a dict with the same quantities as process_demag_data
+        (T in K, powers in uW), or None while the filters are filling.
+        """
+        # drop glitches of the bridge like the offline analysis does
+        if C < 73 and self.C_last is not None:
+            C = self.C_last
+        self.C_last = C
+        T_raw = 1e-3*self.mct.C2T_low(C)
+        T, dTdt = self.T_fit.push(t, T_raw)
+        B_s, dBdt = self.B_fit.push(t, B)
+        self.n += 1
+
+        nmr = nmr if nmr is not None else self.nmr
+        if np.isnan(T):
+            return None
+
+        # initial point of the demag: closest approach to Bi so far
+        if self.Bi is None or abs(B_s - self.Bi_target) < abs(self.Bi - self.Bi_target):
+            self.Ti, self.Bi = T, B_s
+        Tideal = self.Ti*B/self.Bi
+        Cn = cal_Cn(T, B_s)
+        Pideal = 1e6*Cn*self.Ti*dBdt/self.Bi
+        Ptotal = 1e6*Cn*dTdt
+
+        self.latest = {
+            't': t,
+            'T': T_raw,
+            'Tmct_mK': 1e3*T_raw,
+            'Tideal_mK': 1e3*Tideal,
+            'deltaT': 1e3*(T_raw - Tideal),
+            'Cn': Cn,
+            'dBdt': dBdt,
+            'dBdt_abs': -1e3*60*dBdt,
+            'dTdt': dTdt,
+            'Pideal': Pideal,
+            'Ptotal': Ptotal,
+            'Pheat': Ptotal - Pideal,
+        }
+
+        if nmr is not None:
+            M0, T_nmr = nmr
+            if T_nmr != self._last_nmr_T and self.n - self._last_nmr_n >= self.nmr_distance:
+                if self._last_nmr_T is not None:
+                    self.nmr_points.append({
+                        'tnmr_s': t, 'Bnmr': B, 'M0': M0, 'Tnmr': T_nmr,
+                        'Tnmr_ideal': 1e3*Tideal,
+                    })
+                self._last_nmr_n = self.n
+                # a change within nmr_distance stays pending until it is taken
+                self._last_nmr_T = T_nmr
+        return self.latest
+
 if __name__ == "__main__":
         
     app = dash.Dash(__name__)
@@ -0,0 +1,196 @@
+# DemagSchedule.py
+import contextlib
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from demag_gui.core.ramp import run_ramp
+from demag_gui.utils.DemagCalculator import cal_Cn
+
+
+class DemagSegment(NamedTuple):
+    """One linear ramp of a demag schedule"""
+    start: float  # T
+    stop: float  # T
+    rate: float  # T/s
+    wait: float  # s, hold after reaching stop
+    t_start: float  # s, planned start since the beginning of the schedule
+    t_stop: float  # s, planned arrival at stop
+
+
+def segments_from_target_rates(target_rates, start_field=8.5):
+    """
+    Turn the target_rates of DemagTimeCalculator ({stop_T: {'rate': mT/min,
+    'wait_time_min': min}}, in ramp order) into DemagSegments.
+    """
+    segments = []
+    field, t = start_field, 0.
+    for stop, target in target_rates.items():
+        rate = float(target['rate']) / 1000 / 60
+        if rate <= 0:
+            raise ValueError(f'Ramp rate to {stop} T must be positive, got {target["rate"]} mT/min')
+        t_stop = t + abs(field - stop) / rate
+        segments.append(DemagSegment(field, stop, rate, target['wait_time_min'] * 60, t, t_stop))
+        field, t = stop, t_stop + target['wait_time_min'] * 60
+    return segments
+
+
+def exponential_profile(B0=8.5, B_end=0.03, time_to_1T_hours=15):
+    """
+    B(t) = B0*exp(-k*t) with the decay constant of DemagTimeCalculator,
+    returns (B, t_end) with t in s
+    """
+    k = np.log(8.5/0.1)/time_to_1T_hours/3600  # in 1/s
+    return (lambda t: B0*np.exp(-k*np.asarray(t))), np.log(B0/B_end)/k
+
+
+def constant_power_profile(P_uW, Bi=8.5, Ti=0.01, B_end=0.03):
+    """
+    Field profile absorbing a constant heat load P_uW along the ideal
+    adiabat T = Ti*B/Bi, i.e. cal_Cn(T, B)*Ti/Bi*|dB/dt| = P.
+
+    Returns (B, t_end) with t in s, Ti in K.
+    """
+    B_grid = np.linspace(Bi, B_end, 2001)
+    dtdB = cal_Cn(Ti*B_grid/Bi, B_grid)*Ti/Bi/(P_uW*1e-6)  # s/T
+    t_grid = np.concatenate(([0.], np.cumsum(0.5*(dtdB[1:] + dtdB[:-1])*(Bi - B_end)/(len(B_grid) - 1))))
+    return (lambda t: np.interp(t, t_grid, B_grid)), t_grid[-1]
+
+
+def profile_segments(B, t_end, max_error=1e-3, min_duration=60., n_check=16):
+    """
+    Approximate a field profile B(t) (t in s, B in T) by DemagSegments.
+
+    Segments are made as long as possible while the linear ramp stays
+    within ``max_error`` T of B(t), checked at ``n_check`` points per
+    segment, and never shorter than ``min_duration`` s, which bounds the
+    rate of commands sent to the supply.
+    """
+    def fits(t0, t1):
+        t = np.linspace(t0, t1, n_check + 2)[1:-1]
+        line = B(t0) + (B(t1) - B(t0))*(t - t0)/(t1 - t0)
+        return np.max(np.abs(B(t) - line)) <= max_error
+
+    segments = []
+    t0 = 0.
+    while t0 < t_end:
+        # grow the segment by doubling, then bisect the longest that fits
+        lo, hi = min(t0 + min_duration, t_end), None
+        step = min_duration
+        while hi is None and lo < t_end:
+            step *= 2
+            candidate = min(t0 + step, t_end)
+            if fits(t0, candidate):
+                lo = candidate
+            else:
+                hi = candidate
+        if hi is not None:
+            for _ in range(20):
+                mid = 0.5*(lo + hi)
+                if hi - lo < 1.:
+                    break
+                if fits(t0, mid):
+                    lo = mid
+                else:
+                    hi = mid
+        t1 = lo
+        start, stop = float(B(t0)), float(B(t1))
+        segments.append(DemagSegment(start, stop, abs(start - stop)/(t1 - t0), 0., t0, t1))
+        t0 = t1
+    return segments
+
+
+class DemagScheduleExecutor:
+    """
+    Drive a MercuryiPS power supply through a sequence of DemagSegments.
+
+    Every segment sets the ramp rate and target, waits for the ramp with
+    the adaptive polling of ``wait_for_ramp`` and then holds for the wait
+    time of the segment. Segments the field has already passed are
+    skipped, so after an interruption ``run`` resumes from the present
+    field. ``on_transition(event, index, segment, status)`` is called with
+    event 'ramp', 'hold', 'done' or 'stopped' for logging.
+    """
+
+    def __init__(self, worker, segments, lock=None, on_transition=None, tol=1e-3):
+        self.worker = worker
+        self.segments = list(segments)
+        self.lock = contextlib.nullcontext() if lock is None else lock
+        self.on_transition = on_transition
+        self.tol = tol  # T, a segment counts as done within this distance of its stop
+        self.index = None  # segment in progress
+
+    def _status(self):
+        with self.lock:
+            return self.worker.status()
+
+    def _transition(self, event, index, status=None):
+        if self.on_transition:
+            self.on_transition(event, index, self.segments[index],
+                               self._status() if status is None else status)
+
+    def first_segment(self, field):
+        """Index of the first segment still to run from ``field``"""
+        for i, segment in enumerate(self.segments):
+            if field > segment.stop + self.tol:
+                return i
+        return len(self.segments)
+
+    def remaining_time(self, field):
+        """Planned time in s from ``field`` to the end of the schedule"""
+        i = self.first_segment(field)
+        if i == len(self.segments):
+            return 0.
+        segment = self.segments[i]
+        return (self.segments[-1].t_stop + self.segments[-1].wait - segment.t_stop
+                + (field - segment.stop) / segment.rate)
+
+    def run(self, stop_callback=None, sleep=time.sleep, progress_callback=None):
+        """
+        Run the remaining segments, blocking.
+
+        Returns True when the schedule is complete and False if stopped,
+        in which case the supply is put on HOLD.
+        """
+        status = self._status()
+        if status.heater_switch != 'ON':
+            raise RuntimeError(f'Switch heater is {status.heater_switch}, '
+                               'turn it on before running a demag schedule')
+
+        for i in range(self.first_segment(status.field), len(self.segments)):
+            self.index = i
+            segment = self.segments[i]
+            with self.lock:
+                self.worker.field_ramp_rate(segment.rate)
+                self.worker.field_target(segment.stop)
+                self.worker.ramp_to_target()
+            self._transition('ramp', i)
+
+            finished = self.worker.wait_for_ramp(stop_callback=stop_callback,
+                                                 progress_callback=progress_callback,
+                                                 lock=self.lock, sleep=sleep)
+            if finished and segment.wait > 0:
+                self._transition('hold', i)
+                deadline = time.monotonic() + segment.wait
+                while not (stop_callback and stop_callback()):
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    sleep(min(left, 1.))
+                else:
+                    finished = False
+
+            if not finished:
+                with self.lock:
+                    self.worker.ramp_status('HOLD')
+                self._transition('stopped', i)
+                return False
+            self._transition('done', i)
+        self.index = None
+        return True
+
+    def start(self, stop_callback=None, progress_callback=None):
+        """Run in a background thread, returns a RampHandle"""
+        return run_ramp(lambda handle: self.run(handle.stopping, handle.wait, handle.report),
+                        stop_callback, progress_callback, name='demag schedule')
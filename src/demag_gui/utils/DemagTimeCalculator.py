@@ -5,13 +5,11 @@ import pandas as pd
 
 
 
-def DemagTimeCalculator(time_to_1T_hours=15, wait_time_min_low=10, start_time = '2026-01-29T00:00:00'):
-    # TODO: make this a class that can be imported and used elsewhere
-    # start_time is a datetime for the beginning of the demagnetization schedule
-    
-    start_time = datetime.strptime(start_time, '%Y-%m-%dT%H:%M:%S')
-
-
+def demag_windows(time_to_1T_hours=15):
+    """
+    Field windows [start, stop] in T, their [start, stop] times in hours
+    and the average rate of each window in T/hour
+    """
     field_targets = [8, 7, 6, 5, 4, 3, 2, 1, 0.6, 0.03]
     field_windows = [[8.5, field_targets[0]]]
     field_windows += [[field_targets[i], field_targets[i+1]] for i in range(len(field_targets)-1)]
@@ -23,6 +21,31 @@ def DemagTimeCalculator(time_to_1T_hours=15, wait_time_min_low=10, start_time =
     window_times_hours = [np.log(8.5/np.asarray(f))/k for f in field_windows]
     # avg_rates_T_per_hr: average rate across each window in Tesla/hour
     avg_rates_T_per_hr = [(target[0]-target[1])/(t[1]-t[0]) for target, t in zip(field_windows, window_times_hours)]
+    return field_windows, window_times_hours, avg_rates_T_per_hr
+
+
+def wait_time_min(stop_T, wait_time_min_low=10):
+    """Time to wait after reaching a target, only below 2 T"""
+    return 0 if stop_T>2 else wait_time_min_low
+
+
+def demag_target_rates(time_to_1T_hours=15, wait_time_min_low=10):
+    """target_rates as returned by DemagTimeCalculator, without printing or plotting"""
+    field_windows, _, avg_rates_T_per_hr = demag_windows(time_to_1T_hours)
+    return {
+        window[1]: {'rate': round(rate * 1000 / 60, 0),
+                    'wait_time_min': wait_time_min(window[1], wait_time_min_low)}
+        for window, rate in zip(field_windows, avg_rates_T_per_hr)
+    }
+
+
+def DemagTimeCalculator(time_to_1T_hours=15, wait_time_min_low=10, start_time = '2026-01-29T00:00:00'):
+    # TODO: make this a class that can be imported and used elsewhere
+    # start_time is a datetime for the beginning of the demagnetization schedule
+    
+    start_time = datetime.strptime(start_time, '%Y-%m-%dT%H:%M:%S')
+
+    field_windows, window_times_hours, avg_rates_T_per_hr = demag_windows(time_to_1T_hours)
 
     # field_rate_map_mT_per_min: mapping used/presented to the user (units: mT/min)
     field_rate_mapping = {
@@ -54,7 +77,7 @@ def DemagTimeCalculator(time_to_1T_hours=15, wait_time_min_low=10, start_time =
         time_points_hours += list(np.linspace(t_hours[0], t_hours[1], 100))
 
         start_T, stop_T = window[0], window[1]
-        wait_time_min = 0 if stop_T>2 else wait_time_min_low
+        wait_min = wait_time_min(stop_T, wait_time_min_low)
 
         field_values_T += list(np.linspace(start_T, stop_T, num=100))
 
@@ -64,10 +87,10 @@ def DemagTimeCalculator(time_to_1T_hours=15, wait_time_min_low=10, start_time =
                 f"from {start_T} to {stop_T}",  
                 f"{rate_mT_per_min} mT/min", 
                 f"{(t_hours[1]-t_hours[0]):.2f} hrs", 
-                f"wait for {wait_time_min} min" if wait_time_min>0 else "no wait"]
+                f"wait for {wait_min} min" if wait_min>0 else "no wait"]
         ]
         total_time_hours += t_hours[1]-t_hours[0]
-        target_rates[stop_T] = {'rate':rate_mT_per_min, 'wait_time_min': wait_time_min}
+        target_rates[stop_T] = {'rate':rate_mT_per_min, 'wait_time_min': wait_min}
 
     # convert sampled hour offsets into actual datetimes
     time_datetimes = [datetime.fromtimestamp(start_time.timestamp() + th * 3600) for th in time_points_hours]
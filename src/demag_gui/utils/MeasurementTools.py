@@ -38,7 +38,7 @@ def timming(target, trigger=1., actions=[]):
             action()
         sleep(trigger)
 
-def magnet_heater_on(mips, actions=[]):
+def magnet_heater_on(mips, actions=[], stop_callback=None):
     # if already on, skip
     if mips.GRPZ.heater_switch() == 'ON':
         print(f'heater is already {mips.GRPZ.heater_switch()}, skip.')
@@ -59,10 +59,16 @@ def magnet_heater_on(mips, actions=[]):
         mips.ramp(mode="simul")
         print(f'rampping field to {mips.GRPZ.field_target()}')
         print(f'persistance field = {B_persistance}')
-        while not mips.GRPZ.ramp_status()=='HOLD':
-            print(f'output field = {mips.GRPZ.field()}', end='\r')
+
+        def progress(status, time_left):
+            print(f'output field = {status.field}', end='\r')
             for action in actions:
                 action()
+
+        if not mips.GRPZ.wait_for_ramp(stop_callback=stop_callback, progress_callback=progress):
+            mips.GRPZ.ramp_status('HOLD')
+            print('\nstopped, ramp on hold')
+            return 'stopped'
     print(f'output field = {mips.GRPZ.field()}\n')
     
     # check output field again
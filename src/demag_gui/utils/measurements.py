@@ -1,5 +1,4 @@
 # measurements.py
-import importlib
 import time
 from datetime import datetime
 
@@ -9,45 +8,43 @@ from qcodes.dataset import (
     initialise_or_create_database_at,
     load_or_create_experiment,
 )
-from qcodes.parameters import ElapsedTimeParameter
-
-# ============ Measurement function whitelist ============
-MEASUREMENT_WHITELIST = [
-    'RampField',
-    'MonitorConnectedInstruments',
-    'TemperatureSweep',
-    'HeatLeak'
-]
-
-def reload_measurements_module():
-    """Reload measurements module"""
-    from demag_gui.utils import measurements
-    importlib.reload(measurements)
-    return measurements, True
+from qcodes.parameters import ElapsedTimeParameter, Parameter
+
+from demag_gui.core.datasaver import BufferedDataSaver
+from demag_gui.core.registry import MeasurementRegistry, measurement
+from demag_gui.core.scheduler import get_scheduler
+from demag_gui.utils.DemagSchedule import (
+    DemagScheduleExecutor,
+    exponential_profile,
+    profile_segments,
+    segments_from_target_rates,
+)
+from demag_gui.utils.DemagTimeCalculator import demag_target_rates
+
+# ============ Measurement registry ============
+# Functions decorated with @measurement are listed in the GUI. This file is
+# only loaded again when it changes on disk.
+REGISTRY = MeasurementRegistry(__name__)
+
 
 def get_all_measurements():
-    """Get all measurement functions from whitelist"""
-    measurements_module, reloaded = reload_measurements_module()
-    
-    functions = []
-    for name in MEASUREMENT_WHITELIST:
-        if hasattr(measurements_module, name):
-            func = getattr(measurements_module, name)
-            doc = func.__doc__ or "No description"
-            functions.append((name, doc))
-    
-    return functions, reloaded
+    """Get all registered measurement functions"""
+    return REGISTRY.measurements()
 
 
+@measurement(panels=True)
 def MonitorConnectedInstruments(mct_panel, nmr_panel, mips_panel, hs_panel, stop_callback=None, **kwargs):
     """
-    Monitor readings from connected instruments using displayed values from UI panels
-    
+    Monitor readings from connected instruments using the latest values polled by the panels
+
+    Values come from the scheduler cache at full precision, a row is only
+    written when at least one instrument delivered a new reading.
+
     Args:
-        mct_panel: MCT control panel object with display widgets
-        nmr_panel: NMR control panel object with display widgets
-        mips_panel: MIPS control panel object with display widgets
-        hs_panel: HS control panel object with display widgets
+        mct_panel: MCT control panel object
+        nmr_panel: NMR control panel object
+        mips_panel: MIPS control panel object
+        hs_panel: HS control panel object
         **kwargs: Additional parameters
     """
 
@@ -55,6 +52,8 @@ def MonitorConnectedInstruments(mct_panel, nmr_panel, mips_panel, hs_panel, stop
     database_path = kwargs.get('database_path', "testdata/Monitor.db")
     experiment_name = kwargs.get('experiment_name', f"Monitor-{datetime.now().strftime('%Y-%m-%d_%H%M%S')}")
     interval = kwargs.get('interval', 0.35)
+    flush_interval = kwargs.get('flush_interval', 10.)  # in s
+    flush_size = kwargs.get('flush_size', 100)  # in rows
     
     # QCoDeS database initialization
     initialise_or_create_database_at(database_path)
@@ -69,12 +68,13 @@ def MonitorConnectedInstruments(mct_panel, nmr_panel, mips_panel, hs_panel, stop
     station.add_component(t)
 
     monitor_params = {}
+    cache = get_scheduler().cache
 
-    # Build parameters from panel displays (prefer UI textboxes — stable even without drivers)
+    # Build parameters from the cached readings of the panels (keys as registered with the scheduler)
     if mct_panel.mct_instrument:
         mct_dict = {
-            'mct_C': {'instrument': mct_panel.mct_instrument.C, 'get':mct_panel.cap_display.displayText},
-            'mct_L': {'instrument': mct_panel.mct_instrument.L, 'get': mct_panel.loss_display.displayText},
+            'mct_C': {'instrument': mct_panel.mct_instrument.C, 'key': 'mct_C'},
+            'mct_L': {'instrument': mct_panel.mct_instrument.L, 'key': 'mct_L'},
         }
         for p in mct_dict.values():
             station.add_component(p['instrument'])
@@ -84,11 +84,11 @@ def MonitorConnectedInstruments(mct_panel, nmr_panel, mips_panel, hs_panel, stop
         nmr_dict = {
             'M0': {
                 'instrument': nmr_panel.nmr.M0,
-                'get': nmr_panel.m0_label.text
+                'key': 'nmr_M0'
             },
             'L': {
                 'instrument': nmr_panel.nmr.TmK,
-                'get': nmr_panel.t_label.text
+                'key': 'nmr_TmK'
             }
         }
         for p in nmr_dict.values():
@@ -99,11 +99,11 @@ def MonitorConnectedInstruments(mct_panel, nmr_panel, mips_panel, hs_panel, stop
         mips_dict = {
             'field_persistent': {
                 'instrument': mips_panel.mips_instrument.GRPZ.field_persistent,
-                'get': mips_panel.bpersistent_display
+                'key': 'mips_field_persistent'
             },
             'field': {
                 'instrument': mips_panel.mips_instrument.GRPZ.field,
-                'get': mips_panel.bout_display
+                'key': 'mips_field'
             },
         }
         for p in mips_dict.values():
@@ -129,20 +129,106 @@ def MonitorConnectedInstruments(mct_panel, nmr_panel, mips_panel, hs_panel, stop
         context_meas.register_parameter(dep['instrument'], setpoints=indeps)
 
     with context_meas.run() as datasaver:
+        writer = BufferedDataSaver(datasaver, flush_interval=flush_interval, flush_size=flush_size)
         t.reset_clock()
-        while True:
-            if stop_callback and stop_callback():
-                return 'Measurement stopped.'
+        next_time = time.monotonic()
+        keys = [dev['key'] for dev in deps]
+        last_timestamps = None
+        try:
+            while True:
+                if stop_callback and stop_callback():
+                    # count the last batch in the summary
+                    writer.flush()
+                    return f'Measurement stopped. {writer.summary()}'
+
+                readings = cache.snapshot(keys)
+                timestamps = [readings[key][1] for key in keys]
+                if timestamps != last_timestamps:
+                    last_timestamps = timestamps
+                    results = []
+                    for dev in indeps:
+                        results.append((dev, dev()))
+                    for dev in deps:
+                        value = readings[dev['key']][0]
+                        results.append((dev['instrument'], float('nan') if value is None else float(value)))
+
+                    writer.add_result(*results)
+
+                # sleep to the next tick, so flushes do not shift the sampling
+                next_time += interval
+                time.sleep(max(0., next_time - time.monotonic()))
+        finally:
+            writer.flush()
+
+
+@measurement(panels=True)
+def RunDemagSchedule(mct_panel, nmr_panel, mips_panel, hs_panel, stop_callback=None, **kwargs):
+    """
+    Ramp the magnet through the DemagTimeCalculator schedule
 
-            results = []
-            for dev in indeps:
-                results.append((dev, dev()))
-            for dev in deps:
-                results.append((dev['instrument'], float(dev['get']())))
+    Segments are ramped one after the other with their waits in between,
+    starting from the present field, so a stopped schedule resumes where
+    it was left. Every segment transition is written to the dataset.
 
-            datasaver.add_result(*results)
+    Args:
+        mips_panel: MIPS control panel object, must be connected
+        **kwargs: time_to_1T_hours, wait_time_min_low (as for
+            DemagTimeCalculator), start_field, database_path, experiment_name.
+            profile='exponential' follows B0*exp(-k*t) closely instead of
+            the 10 windows, a (B(t), t_end) tuple any other profile; both
+            within max_error T (default 1e-3) with segments of at least
+            min_duration s (default 60)
+    """
+    if not mips_panel.mips_instrument:
+        return 'MIPS is not connected'
+
+    database_path = kwargs.get('database_path', "testdata/Demag.db")
+    experiment_name = kwargs.get('experiment_name', f"Demag-{datetime.now().strftime('%Y-%m-%d_%H%M%S')}")
+    profile = kwargs.get('profile', 'windows')
+    if profile == 'windows':
+        target_rates = kwargs.get('target_rates') or demag_target_rates(
+            kwargs.get('time_to_1T_hours', 15), kwargs.get('wait_time_min_low', 10))
+        segments = segments_from_target_rates(target_rates, kwargs.get('start_field', 8.5))
+    else:
+        if profile == 'exponential':
+            profile = exponential_profile(kwargs.get('start_field', 8.5), kwargs.get('end_field', 0.03),
+                                          kwargs.get('time_to_1T_hours', 15))
+        segments = profile_segments(*profile, max_error=kwargs.get('max_error', 1e-3),
+                                    min_duration=kwargs.get('min_duration', 60.))
+
+    initialise_or_create_database_at(database_path)
+    experiment = load_or_create_experiment(experiment_name=experiment_name, sample_name="no sample")
+
+    grpz = mips_panel.mips_instrument.GRPZ
+    lock = get_scheduler().bus_lock(mips_panel.addr_input.text())
+
+    t = ElapsedTimeParameter("t")
+    segment = Parameter('segment', label='Segment', get_cmd=None, set_cmd=None)
+    event = Parameter('event', label='Event', get_cmd=None, set_cmd=None)
+    field = Parameter('field', label='Field', unit='T', get_cmd=None, set_cmd=None)
+    field_target = Parameter('field_target', label='Target field', unit='T', get_cmd=None, set_cmd=None)
+    field_ramp_rate = Parameter('field_ramp_rate', label='Ramp rate', unit='T/s', get_cmd=None, set_cmd=None)
+
+    context_meas = Measurement(exp=experiment, name="demag schedule")
+    context_meas.register_parameter(t)
+    for param in (segment, field, field_target, field_ramp_rate):
+        context_meas.register_parameter(param, setpoints=(t,))
+    context_meas.register_parameter(event, setpoints=(t,), paramtype='text')
+
+    with context_meas.run() as datasaver:
+        t.reset_clock()
+
+        def log_transition(name, index, seg, status):
+            datasaver.add_result((t, t()), (segment, index), (event, name), (field, status.field),
+                                 (field_target, status.field_target),
+                                 (field_ramp_rate, status.field_ramp_rate))
+            print(f'{name} segment {index}: {seg.start} T -> {seg.stop} T at '
+                  f'{seg.rate * 60e3:.0f} mT/min, field = {status.field} T')
 
-            time.sleep(interval)
+        executor = DemagScheduleExecutor(grpz, segments, lock=lock, on_transition=log_transition)
+        if executor.run(stop_callback):
+            return f'Demag schedule completed, {len(segments)} segments'
+        return f'Demag schedule stopped in segment {executor.index}'
 
 # Placeholder functions (add your implementations here)
 
@@ -158,14 +244,13 @@ def run_measurement(func_name, mct_panel=None, nmr_panel=None, mips_panel=None,
         mct, nmr, mips, hs: Instrument objects
         **kwargs: Additional parameters
     """
-    # Reload module to get latest functions
-    measurements_module, reloaded = reload_measurements_module()
-    
-    if hasattr(measurements_module, func_name):
-        func = getattr(measurements_module, func_name)
+    # Latest version of the function, reloaded only if the file changed
+    func = REGISTRY.get(func_name)
+
+    if func is not None:
         try:
             # Pass appropriate objects
-            if func_name == "MonitorConnectedInstruments":
+            if func.__measurement__['panels']:
                 result = func(mct_panel, nmr_panel, mips_panel, hs_panel, **kwargs)
             else:
                 result = func(mct, nmr, mips, hs, **kwargs)